@@ -0,0 +1,90 @@
+"""Compare results-endpoint serialization before and after the Pydantic v2 fast path.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_serialization --days 365 --repeat 20
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.data_generator import generate_game_statistics
+from backend.main import GZIP_MINIMUM_SIZE
+from backend.models import GameStatistic
+from backend.schemas import TaskResult
+
+
+def build_stats(days):
+    end_date = date(2024, 12, 31)
+    start_date = end_date - timedelta(days=days - 1)
+    raw = generate_game_statistics('all', start_date, end_date, ['kills', 'deaths', 'wins', 'losses'])
+    return [
+        GameStatistic(
+            task_id=1,
+            kd_ratio=stat["kills"] / stat["deaths"],
+            win_rate=stat["wins"] / max(1, stat["wins"] + stat["losses"]),
+            **stat
+        )
+        for stat in raw
+    ]
+
+
+def serialize_before(stats):
+    """Manual dict construction + response_model validation + stdlib json, as the endpoint used to do"""
+    result_data = []
+    for stat in stats:
+        result_data.append({
+            "game": stat.game,
+            "character": stat.character,
+            "date": stat.date.strftime("%Y-%m-%d"),
+            "kills": stat.kills,
+            "deaths": stat.deaths,
+            "wins": stat.wins,
+            "losses": stat.losses,
+            "kd_ratio": stat.kd_ratio,
+            "win_rate": stat.win_rate
+        })
+    validated = TaskResult(task_id=1, data=result_data)
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode("utf-8")
+
+
+def serialize_after(stats):
+    return TaskResult(task_id=1, data=stats).model_dump_json().encode("utf-8")
+
+
+def time_it(func, stats, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(stats)
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def wire_size(body):
+    if len(body) < GZIP_MINIMUM_SIZE:
+        return len(body)
+    return len(gzip.compress(body, compresslevel=9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365, help="days of 'all' games data to serialize")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    stats = build_stats(args.days)
+    print(f"{len(stats)} rows")
+    print(f"{'path':<8} {'time (ms)':>10} {'raw bytes':>12} {'wire bytes':>12}")
+    for label, func, compressed in (("before", serialize_before, False), ("after", serialize_after, True)):
+        seconds, body = time_it(func, stats, args.repeat)
+        on_wire = wire_size(body) if compressed else len(body)
+        print(f"{label:<8} {seconds * 1000:>10.2f} {len(body):>12} {on_wire:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Track cold-start latency: import time and time to first request.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_startup --repeat 5
+
+Each measurement runs in a fresh interpreter against a throwaway database.
+"Fresh database" runs include schema creation; "current schema" runs hit the
+startup version check only, as a restarted or autoscaled worker would.
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import backend.main
+print(time.perf_counter() - start)
+"""
+
+FIRST_REQUEST_SNIPPET = """
+import time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from backend.main import app
+with TestClient(app) as client:
+    assert client.get("/api/tasks").status_code == 200
+    print(time.perf_counter() - start)
+"""
+
+
+def run_snippet(snippet, env):
+    output = subprocess.run(
+        [sys.executable, "-c", snippet], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_first_request(env):
+    """Seconds from spawning backend.serve to its first successful response"""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "backend.serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "1", "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        while True:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                conn.request("GET", "/api/tasks")
+                if conn.getresponse().status == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+            if time.perf_counter() - start > 30:
+                raise RuntimeError("server did not start")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def measure(label, func, repeat, fresh_database):
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(repeat):
+            name = f"startup_{run}.db" if fresh_database else "startup.db"
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, name)}")
+            timings.append(func(env))
+    # With a shared database the first run creates the schema; report the rest
+    if not fresh_database and len(timings) > 1:
+        timings = timings[1:]
+    print(f"{label:<44} {statistics.median(timings) * 1000:>9.1f} {min(timings) * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'measurement':<44} {'median ms':>9} {'min ms':>9}")
+    measure("import backend.main", lambda env: run_snippet(IMPORT_SNIPPET, env), args.repeat, True)
+    for fresh, suffix in ((True, "fresh database"), (False, "current schema")):
+        measure(f"first request, in-process ({suffix})",
+                lambda env: run_snippet(FIRST_REQUEST_SNIPPET, env), args.repeat, fresh)
+        measure(f"first request, uvicorn ({suffix})", server_first_request, args.repeat, fresh)
+
+
+if __name__ == "__main__":
+    main()
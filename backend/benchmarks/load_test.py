@@ -0,0 +1,158 @@
+"""Measure read-endpoint throughput of backend.serve at increasing worker counts.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.load_test --workers 1 2 4 --duration 10
+
+A throwaway SQLite database is seeded with one completed task, then for each
+worker count a server is started and hammered by client processes issuing a
+mix of GET /api/tasks, GET /api/tasks/{id} and GET /api/tasks/{id}/results.
+Half of the results reads use a random date window, which the result cache
+does not serve, so the numbers include uncached queries.
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+READ_PATHS = (
+    "/api/tasks",
+    "/api/tasks/{task_id}",
+    "/api/tasks/{task_id}/results",
+    "/api/tasks/{task_id}/results?start_date={start_date}&end_date={end_date}",
+)
+END_DATE = date(2024, 12, 31)
+
+
+def seed_database(database_url, days):
+    """Create the schema and one completed 'all' task; returns its id"""
+    os.environ["DATABASE_URL"] = database_url
+    from backend.database import SessionLocal, engine, ensure_schema
+    from backend.data_generator import generate_game_statistics
+    from backend.models import GameStatistic, Task
+
+    ensure_schema(engine)
+    end_date = END_DATE
+    start_date = end_date - timedelta(days=days - 1)
+    db = SessionLocal()
+    task = Task(
+        name="Load test task",
+        game_type="all",
+        start_date=start_date,
+        end_date=end_date,
+        metrics=["kills", "deaths", "wins", "losses"],
+        status="complete",
+    )
+    db.add(task)
+    db.flush()
+    db.add_all(
+        GameStatistic(task_id=task.id, **stat)
+        for stat in generate_game_statistics("all", start_date, end_date, task.metrics)
+    )
+    db.commit()
+    task_id = task.id
+    db.close()
+    engine.dispose()
+    return task_id
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def client(port, task_id, days, duration, counter):
+    """Issue read requests round-robin over one keep-alive connection"""
+    rng = random.Random(os.getpid())
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    done = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        start_date = END_DATE - timedelta(days=rng.randrange(days))
+        end_date = start_date + timedelta(days=rng.randrange(30))
+        path = READ_PATHS[done % len(READ_PATHS)].format(task_id=task_id, start_date=start_date, end_date=end_date)
+        conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}")
+        done += 1
+    conn.close()
+    with counter.get_lock():
+        counter.value += done
+
+
+def run_load(port, task_id, days, clients, duration):
+    counter = multiprocessing.Value("i", 0)
+    procs = [
+        multiprocessing.Process(target=client, args=(port, task_id, days, duration, counter))
+        for _ in range(clients)
+    ]
+    start = time.monotonic()
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    return counter.value / (time.monotonic() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=None, help="client processes (default 2x max workers)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--days", type=int, default=365, help="days of data in the seeded task")
+    args = parser.parse_args()
+    clients = args.clients or 2 * max(args.workers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'load_test.db')}"
+        task_id = seed_database(database_url, args.days)
+        env = dict(os.environ, DATABASE_URL=database_url)
+
+        baseline = None
+        print(f"{'workers':>8} {'req/s':>10} {'scaling':>8} {'ideal':>7}")
+        for workers in args.workers:
+            port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, "-m", "backend.serve", "--host", "127.0.0.1",
+                 "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+                env=env,
+            )
+            try:
+                wait_until_ready(port)
+                # Warm the result cache and each worker's connection pool
+                run_load(port, task_id, args.days, clients, 1.0)
+                throughput = run_load(port, task_id, args.days, clients, args.duration)
+            finally:
+                server.terminate()
+                server.wait()
+            baseline = baseline or (workers, throughput)
+            ideal = workers / baseline[0]
+            print(f"{workers:>8} {throughput:>10.1f} {throughput / baseline[1]:>8.2f}x {ideal:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
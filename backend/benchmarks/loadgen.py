@@ -0,0 +1,303 @@
+"""Seeded synthetic load generator for capacity planning.
+
+Run from the repository root. First populate a database with completed tasks:
+
+    python -m backend.benchmarks.loadgen populate --database-url sqlite:///./capacity.db \\
+        --tasks 200 --days lognormal:60:1.0 --all-fraction 0.2 --seed 42
+
+then start a server on it and replay an API mix at a target rate:
+
+    DATABASE_URL=sqlite:///./capacity.db python -m backend.serve --workers 4 --port 8000
+    python -m backend.benchmarks.loadgen replay --url http://127.0.0.1:8000 \\
+        --rate 200 --duration 60 --mix create=1,poll=4,results=4,delete=1 --seed 42
+
+The same seed always produces the same tasks, statistics and request sequence.
+"""
+import argparse
+import gzip
+import http.client
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+
+# Game types whose characters match GAME_CHARACTERS keys, so filters hit real rows
+SIMPLE_GAME_TYPES = ['valorant', 'overwatch', 'fortnite']
+METRICS = ['kills', 'deaths', 'wins', 'losses', 'kd_ratio', 'win_rate']
+MAX_TASK_DAYS = 3650
+LAST_DAY = date(2024, 12, 31)
+
+
+def parse_distribution(spec):
+    """Parse fixed:N, uniform:LO:HI or lognormal:MEDIAN:SIGMA into a sampler of task lengths in days"""
+    kind, *params = spec.split(":")
+    try:
+        params = [float(p) for p in params]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid distribution {spec!r}") from None
+    if kind == "fixed" and len(params) == 1:
+        sample = lambda rng: params[0]
+    elif kind == "uniform" and len(params) == 2:
+        sample = lambda rng: rng.uniform(params[0], params[1])
+    elif kind == "lognormal" and len(params) == 2:
+        sample = lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+    else:
+        raise argparse.ArgumentTypeError(f"invalid distribution {spec!r}")
+    return lambda rng: min(MAX_TASK_DAYS, max(1, round(sample(rng))))
+
+
+def parse_mix(spec):
+    """Parse op=weight pairs, e.g. create=1,poll=4,results=4,delete=1"""
+    mix = {}
+    for part in spec.split(","):
+        op, _, weight = part.partition("=")
+        if op not in ("create", "poll", "results", "delete"):
+            raise argparse.ArgumentTypeError(f"unknown operation {op!r}")
+        mix[op] = float(weight)
+    return mix
+
+
+def random_task(rng, days_dist, all_fraction):
+    """Task fields for one synthetic task"""
+    from backend.data_generator import GAME_CHARACTERS
+
+    days = days_dist(rng)
+    end_date = LAST_DAY - timedelta(days=rng.randint(0, 365))
+    start_date = end_date - timedelta(days=days - 1)
+    if rng.random() < all_fraction:
+        game_type, characters = 'all', []
+    else:
+        game_type = rng.choice(SIMPLE_GAME_TYPES)
+        characters = rng.sample(GAME_CHARACTERS[game_type], rng.randint(1, 3))
+    return {
+        "name": f"loadgen-{game_type}-{days}d",
+        "game_type": game_type,
+        "start_date": start_date,
+        "end_date": end_date,
+        "metrics": rng.sample(METRICS, rng.randint(1, len(METRICS))),
+        "characters": characters,
+    }
+
+
+def populate(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    from backend.data_generator import generate_game_statistics
+    from backend.database import SessionLocal, engine, ensure_schema
+    from backend.metrics import build_game_statistic
+    from backend.models import Task
+
+    ensure_schema(engine)
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(args.tasks):
+        fields = random_task(rng, args.days, args.all_fraction)
+        task = Task(status="complete", **fields)
+        db.add(task)
+        db.flush()
+        stats = generate_game_statistics(
+            task.game_type, task.start_date, task.end_date, task.metrics, task.characters, rng=rng
+        )
+        db.add_all(build_game_statistic(task.id, stat) for stat in stats)
+        rows += len(stats)
+    db.commit()
+    db.close()
+    print(f"populated {args.tasks} tasks / {rows} statistic rows in {time.perf_counter() - start:.1f}s (seed {args.seed})")
+
+
+def build_plan(rng, mix, rate, duration, known_tasks, days_dist, all_fraction):
+    """Deterministic list of (offset_seconds, op, params) with Poisson arrivals at the target rate"""
+    from backend.data_generator import GAME_CHARACTERS
+
+    ops, weights = zip(*mix.items())
+    plan = []
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        op = rng.choices(ops, weights)[0]
+        if op == "create":
+            params = random_task(rng, days_dist, all_fraction)
+            params = dict(params, start_date=str(params["start_date"]), end_date=str(params["end_date"]))
+        elif op == "results":
+            task = rng.choice(known_tasks)
+            start_date = date.fromisoformat(task["start_date"])
+            span = (date.fromisoformat(task["end_date"]) - start_date).days
+            window_start = start_date + timedelta(days=rng.randint(0, span))
+            query = {"start_date": str(window_start),
+                     "end_date": str(window_start + timedelta(days=rng.randint(0, span)))}
+            characters = task["characters"] or [c for names in GAME_CHARACTERS.values() for c in names]
+            if rng.random() < 0.5:
+                query["character"] = rng.choice(characters)
+            params = {"task_id": task["id"], "query": query}
+        else:
+            # poll and delete act on the n-th task created during the run, resolved when sent
+            params = {"created_index": rng.randint(0, 1 << 30)}
+        plan.append((offset, op, params))
+        offset += rng.expovariate(rate)
+    return plan
+
+
+class Replayer:
+    """Sends planned requests from a thread pool and records latency per operation"""
+
+    def __init__(self, url, concurrency):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.created = []
+        self.latencies = {}
+        self.errors = {}
+        self.send_lags = []
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    def request(self, method, path, body=None):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        headers = {"Accept-Encoding": "gzip"}
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.local.conn = None
+            raise
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        return response.status, data
+
+    def pick_created(self, index, remove):
+        with self.lock:
+            if not self.created:
+                return None
+            position = index % len(self.created)
+            return self.created.pop(position) if remove else self.created[position]
+
+    def execute(self, op, params, scheduled):
+        # Latency runs from the planned send time, so time spent waiting for a free
+        # pool thread while the server falls behind is counted (no coordinated omission)
+        start = time.perf_counter()
+        try:
+            if op == "create":
+                status, body = self.request("POST", "/api/tasks", params)
+                if status == 200:
+                    with self.lock:
+                        self.created.append(json.loads(body)["id"])
+            elif op == "results":
+                status, _ = self.request("GET", f"/api/tasks/{params['task_id']}/results?{urlencode(params['query'])}")
+            else:
+                task_id = self.pick_created(params["created_index"], remove=op == "delete")
+                if task_id is None:
+                    status, _ = self.request("GET", "/api/tasks")
+                elif op == "poll":
+                    status, _ = self.request("GET", f"/api/tasks/{task_id}")
+                else:
+                    status, _ = self.request("DELETE", f"/api/tasks/{task_id}")
+            failed = status >= 400
+        except (OSError, http.client.HTTPException):
+            failed = True
+        elapsed = time.perf_counter() - scheduled
+        with self.lock:
+            self.send_lags.append(max(0.0, start - scheduled))
+            self.latencies.setdefault(op, []).append(elapsed)
+            if failed:
+                self.errors[op] = self.errors.get(op, 0) + 1
+
+    def run(self, plan):
+        start = time.perf_counter()
+        futures = []
+        for offset, op, params in plan:
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(self.pool.submit(self.execute, op, params, scheduled))
+        for future in futures:
+            future.result()
+        self.pool.shutdown()
+        return time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def report(latencies, errors, elapsed, send_lags=()):
+    if not latencies:
+        print("no requests were sent; raise --rate or --duration")
+        return
+    print(f"{'op':<8} {'count':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    everything = []
+    for op in sorted(latencies):
+        values = sorted(latencies[op])
+        everything.extend(values)
+        print_row(op, values, errors.get(op, 0), elapsed)
+    print_row("total", sorted(everything), sum(errors.values()), elapsed)
+    if send_lags:
+        lags = sorted(send_lags)
+        print(f"sends behind schedule: p50 {percentile(lags, 0.5) * 1000:.1f} ms, "
+              f"p99 {percentile(lags, 0.99) * 1000:.1f} ms, max {lags[-1] * 1000:.1f} ms "
+              f"(latencies above include this wait)")
+
+
+def print_row(label, values, errors, elapsed):
+    print(f"{label:<8} {len(values):>7} {errors:>7} {len(values) / elapsed:>8.1f} "
+          f"{percentile(values, 0.5) * 1000:>8.1f} {percentile(values, 0.9) * 1000:>8.1f} "
+          f"{percentile(values, 0.99) * 1000:>8.1f} {values[-1] * 1000:>8.1f}")
+
+
+def replay(args):
+    replayer = Replayer(args.url, args.concurrency)
+    status, body = replayer.request("GET", "/api/tasks")
+    if status != 200:
+        raise SystemExit(f"GET /api/tasks returned {status}")
+    # Sort so the plan does not depend on the order the server lists tasks in
+    known_tasks = sorted((t for t in json.loads(body) if t["status"] == "complete"), key=lambda t: t["id"])
+    if not known_tasks:
+        raise SystemExit("no completed tasks on the server; run the populate command first")
+
+    rng = random.Random(args.seed)
+    plan = build_plan(rng, args.mix, args.rate, args.duration, known_tasks, args.days, args.all_fraction)
+    print(f"replaying {len(plan)} requests at ~{args.rate}/s for {args.duration}s (seed {args.seed})")
+    elapsed = replayer.run(plan)
+    report(replayer.latencies, replayer.errors, elapsed, replayer.send_lags)
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--seed", type=int, default=42)
+    common.add_argument("--days", type=parse_distribution, default="lognormal:30:1.0",
+                        help="task length distribution: fixed:N, uniform:LO:HI or lognormal:MEDIAN:SIGMA")
+    common.add_argument("--all-fraction", type=float, default=0.2, help="share of tasks covering all games")
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    populate_parser = commands.add_parser("populate", parents=[common], help="write completed tasks straight into a database")
+    populate_parser.add_argument("--database-url", default="sqlite:///./gaming_analytics.db")
+    populate_parser.add_argument("--tasks", type=int, default=100)
+    populate_parser.set_defaults(func=populate)
+
+    replay_parser = commands.add_parser("replay", parents=[common], help="replay an API mix against a running server")
+    replay_parser.add_argument("--url", default="http://127.0.0.1:8000")
+    replay_parser.add_argument("--rate", type=float, default=50.0, help="target requests per second")
+    replay_parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    replay_parser.add_argument("--mix", type=parse_mix, default="create=1,poll=4,results=4,delete=1")
+    replay_parser.add_argument("--concurrency", type=int, default=32, help="maximum requests in flight")
+    replay_parser.set_defaults(func=replay)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+from datetime import timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .metrics import aggregate_expression, rolling_query
+from .models import Task, GameStatistic
+from .scheduler import estimate_task_cost
+from .schemas import CompareRequest, CompareResponse, CompareSeries
+
+# Limits on the work a single compare request may ask for
+MAX_COMPARE_TASKS = int(os.environ.get("ANALYTICS_MAX_COMPARE_TASKS", "10"))
+MAX_COMPARE_COST = int(os.environ.get("ANALYTICS_MAX_COMPARE_COST", "100000"))
+
+GROUP_KEYS = {
+    'date': func.strftime('%Y-%m-%d', GameStatistic.date),
+    # Monday the week starts on, so weeks spanning New Year stay in one bucket
+    'week': func.strftime('%Y-%m-%d', GameStatistic.date, 'weekday 0', '-6 days'),
+    'month': func.strftime('%Y-%m', GameStatistic.date),
+    'game': GameStatistic.game,
+    'character': func.coalesce(GameStatistic.character, 'Unknown'),
+}
+
+
+def windowed_cost(task, start_date, end_date, lookback_days=0):
+    """Estimated cost of the part of a task read for the requested dates.
+
+    lookback_days extends the read before start_date, as rolling windows do.
+    """
+    read_start = max(task.start_date, start_date - timedelta(days=lookback_days)) if start_date else task.start_date
+    read_end = min(task.end_date, end_date) if end_date else task.end_date
+    if read_end < read_start:
+        return 0
+    total_days = (task.end_date - task.start_date).days + 1
+    read_days = (read_end - read_start).days + 1
+    return estimate_task_cost(task) * read_days // total_days
+
+
+def compare_tasks(db: Session, request: CompareRequest) -> CompareResponse:
+    """Aggregate one metric for several tasks in a single query and align the series"""
+    if len(request.task_ids) > MAX_COMPARE_TASKS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_TASKS} tasks can be compared at once")
+
+    tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_(request.task_ids)).all()}
+    for task_id in request.task_ids:
+        task = tasks.get(task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+        if task.status != "complete":
+            raise HTTPException(status_code=400, detail=f"Task {task_id} is not completed yet")
+
+    lookback_days = request.window - 1 if request.window else 0
+    cost = sum(
+        windowed_cost(task, request.start_date, request.end_date, lookback_days) for task in tasks.values()
+    )
+    if cost > MAX_COMPARE_COST:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Comparison is too large ({cost} > {MAX_COMPARE_COST}); narrow the date range or compare fewer tasks"
+        )
+
+    query = db.query(GameStatistic).filter(GameStatistic.task_id.in_(request.task_ids))
+
+    if request.end_date:
+        query = query.filter(GameStatistic.date <= request.end_date)
+
+    if request.game and request.game != 'all':
+        query = query.filter(GameStatistic.game == request.game)
+
+    if request.character and request.character != 'all':
+        query = query.filter(GameStatistic.character == request.character)
+
+    if request.window:
+        rows = rolling_query(query, request.metric, request.window, request.start_date).all()
+    else:
+        if request.start_date:
+            query = query.filter(GameStatistic.date >= request.start_date)
+        key = GROUP_KEYS[request.group_by].label("key")
+        rows = (
+            query.with_entities(GameStatistic.task_id, key, aggregate_expression(request.metric).label("value"))
+            .group_by(GameStatistic.task_id, key)
+            .all()
+        )
+
+    keys = sorted({row.key for row in rows})
+    positions = {k: i for i, k in enumerate(keys)}
+    values = {task_id: [None] * len(keys) for task_id in request.task_ids}
+    for row in rows:
+        values[row.task_id][positions[row.key]] = row.value
+
+    return CompareResponse(
+        metric=request.metric,
+        group_by=request.group_by,
+        keys=keys,
+        series=[CompareSeries(task_id=task_id, values=values[task_id]) for task_id in request.task_ids],
+    )
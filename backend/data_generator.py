@@ -22,10 +22,10 @@ GAME_MODIFIERS = {
     # For now, we'll handle unknown games in the function to match existing logic
 }
 
-def generate_daily_stat(game, character, stat_date, skill_level=0.5):
+def generate_daily_stat(game, character, stat_date, skill_level=0.5, rng=random):
     """Generate realistic daily stats for a single game/character"""
-    base_kills = random.randint(5, 25) * skill_level
-    base_deaths = random.randint(5, 20) * (1.5 - skill_level)  
+    base_kills = rng.randint(5, 25) * skill_level
+    base_deaths = rng.randint(5, 20) * (1.5 - skill_level)  
     base_win_chance = 0.3 + (skill_level * 0.4)  
     
     # Add this block in place of the removed one
@@ -33,14 +33,14 @@ def generate_daily_stat(game, character, stat_date, skill_level=0.5):
     kills_modifier = game_specific_modifiers['kills']
     deaths_modifier = game_specific_modifiers['deaths']
         
-    kills = max(0, int(base_kills * kills_modifier * random.uniform(0.8, 1.2)))
-    deaths = max(1, int(base_deaths * deaths_modifier * random.uniform(0.8, 1.2)))  # At least 1 death
+    kills = max(0, int(base_kills * kills_modifier * rng.uniform(0.8, 1.2)))
+    deaths = max(1, int(base_deaths * deaths_modifier * rng.uniform(0.8, 1.2)))  # At least 1 death
     
-    matches = random.randint(5, 15)
+    matches = rng.randint(5, 15)
     
     wins = 0
     for _ in range(matches):
-        if random.random() < base_win_chance:
+        if rng.random() < base_win_chance:
             wins += 1
     
     losses = matches - wins
@@ -61,8 +61,9 @@ def generate_daily_stat(game, character, stat_date, skill_level=0.5):
     
     return stat
 
-def generate_game_statistics(game_type, start_date, end_date, metrics, characters=None):
-    """Generate synthetic game statistics for the specified period and game type with optional character filtering"""
+def generate_game_statistics(game_type, start_date, end_date, metrics, characters=None, rng=random):
+    """Generate synthetic game statistics for the specified period and game type with optional character filtering.
+    Pass a seeded random.Random as rng for repeatable output."""
     if isinstance(start_date, str):
         start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
     if isinstance(end_date, str):
@@ -74,12 +75,12 @@ def generate_game_statistics(game_type, start_date, end_date, metrics, character
     
     result_stats = []
 
-    base_skill_level = random.uniform(0.3, 0.8)
+    base_skill_level = rng.uniform(0.3, 0.8)
     
     current_date = start_date
     while current_date <= end_date:
         for game in games_to_generate:
-            if game_type == 'all' and random.random() > 0.6:
+            if game_type == 'all' and rng.random() > 0.6:
                 continue
                 
             available_characters = GAME_CHARACTERS.get(game, ['Unknown'])
@@ -89,21 +90,22 @@ def generate_game_statistics(game_type, start_date, end_date, metrics, character
                 if filtered_characters:
                     daily_characters = filtered_characters
                 else:
-                    daily_characters = random.sample(available_characters, 1)
+                    daily_characters = rng.sample(available_characters, 1)
             else:
-                characters_played = random.randint(1, 3)
-                daily_characters = random.sample(available_characters, min(characters_played, len(available_characters)))
+                characters_played = rng.randint(1, 3)
+                daily_characters = rng.sample(available_characters, min(characters_played, len(available_characters)))
             
             for character in daily_characters:
-                character_skill = base_skill_level * random.uniform(0.9, 1.1)
-                if random.random() > 0.8:  
-                    character_skill = character_skill * random.uniform(0.6, 1.4)
+                character_skill = base_skill_level * rng.uniform(0.9, 1.1)
+                if rng.random() > 0.8:  
+                    character_skill = character_skill * rng.uniform(0.6, 1.4)
                 
                 daily_stat = generate_daily_stat(
                     game, 
                     character, 
                     current_date,
-                    character_skill
+                    character_skill,
+                    rng
                 )
                 
                 result_stats.append(daily_stat)
@@ -112,10 +114,10 @@ def generate_game_statistics(game_type, start_date, end_date, metrics, character
     
     min_expected_stats = date_range * len(games_to_generate)
     if len(result_stats) < min_expected_stats / 2:
-        extra_dates = [start_date + timedelta(days=random.randint(0, date_range-1)) for _ in range(min_expected_stats)]
+        extra_dates = [start_date + timedelta(days=rng.randint(0, date_range-1)) for _ in range(min_expected_stats)]
         for extra_date in extra_dates:
-            game = random.choice(games_to_generate)
-            character = random.choice(GAME_CHARACTERS.get(game, ['Unknown']))
-            result_stats.append(generate_daily_stat(game, character, extra_date))
+            game = rng.choice(games_to_generate)
+            character = rng.choice(GAME_CHARACTERS.get(game, ['Unknown']))
+            result_stats.append(generate_daily_stat(game, character, extra_date, rng=rng))
     
     return result_stats
@@ -1,16 +1,77 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite:///./gaming_analytics.db"
+def _require_sqlite(url):
+    """The shared queue, result cache, schema versioning and date SQL all rely on SQLite"""
+    backend = make_url(url).get_backend_name()
+    if backend != "sqlite":
+        raise RuntimeError(f"DATABASE_URL must be a sqlite:// URL; this backend supports SQLite only (got {backend})")
+    return url
+
+DATABASE_URL = _require_sqlite(os.environ.get("DATABASE_URL", "sqlite:///./gaming_analytics.db"))
 
 engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
+    DATABASE_URL, connect_args={"check_same_thread": False, "timeout": 30}
 )
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets reader processes run alongside a writer when several workers share the file"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+event.listen(engine, "connect", _set_sqlite_pragmas)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Bump whenever the models change so existing databases pick up the new tables
+SCHEMA_VERSION = 5
+
+def ensure_schema(bind=engine):
+    """Create the tables unless the database is already at SCHEMA_VERSION; returns True if DDL ran"""
+    from . import models  # noqa: F401 - registers the tables on Base
+
+    with bind.connect() as connection:
+        if connection.exec_driver_sql("PRAGMA user_version").scalar() == SCHEMA_VERSION:
+            return False
+
+    Base.metadata.create_all(bind=bind)
+    # create_all skips existing tables, so add columns and indexes introduced since
+    # they were created; columns are added as nullable, which ADD COLUMN allows
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}')
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    _backfill_task_costs(bind)
+    with bind.begin() as connection:
+        connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return True
+
+def _backfill_task_costs(bind):
+    """Estimate the cost of queued tasks created before tasks.cost existed"""
+    from sqlalchemy.orm import Session
+    from .models import Task
+    from .scheduler import estimate_task_cost
+
+    with Session(bind=bind) as db:
+        for task in db.query(Task).filter(Task.cost == None, Task.status.in_(["pending", "in_progress"])):  # noqa: E711
+            task.cost = estimate_task_cost(task)
+        db.commit()
+
 def get_db():
     """Dependency for getting DB session"""
     db = SessionLocal()
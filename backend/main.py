@@ -1,21 +1,57 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
-import uvicorn
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, RedirectResponse, Response
+from pydantic import ValidationError
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, List, Optional
+from datetime import datetime
 import time
-import random
 import logging # Added import
 
-from .database import get_db, engine, Base
+from .database import get_db, engine, ensure_schema
 from .models import Task, GameStatistic
-from .schemas import TaskCreate, TaskResponse, TaskResult
-from .data_generator import generate_game_statistics
+from .schemas import (
+    TaskCreate,
+    TaskResponse,
+    BatchTaskResult,
+    BatchTaskResponse,
+    TaskResult,
+    TaskResponseList,
+    TaskEventResponse,
+    CompareRequest,
+    CompareResponse,
+)
+from .metrics import build_game_statistic, row_expression
+from .scheduler import scheduler, estimate_task_cost, simulated_latency, QUEUE_BACKEND
+from .shared_state import (
+    DatabaseTaskScheduler,
+    publish_status,
+    publish_statuses,
+    events_after,
+    cache_get,
+    cache_set,
+    cache_invalidate,
+)
+
+# Responses smaller than this are sent uncompressed
+GZIP_MINIMUM_SIZE = 1024
 
-Base.metadata.create_all(bind=engine)
+# Largest number of tasks accepted by one POST /api/tasks/batch
+MAX_BATCH_TASKS = 500
 
-app = FastAPI(title="Gaming Analytics API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ensure_schema(engine)
+    # Every process works the shared queue, including ones that never receive a POST
+    if QUEUE_BACKEND == "database":
+        database_scheduler.start()
+    yield
+    database_scheduler.stop()
+
+app = FastAPI(title="Gaming Analytics API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +65,11 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
+def json_response(content: bytes) -> Response:
+    """Wrap pre-serialized JSON so FastAPI skips response_model re-validation"""
+    return Response(content=content, media_type="application/json")
 
 @app.get("/")
 def root():
@@ -36,16 +77,30 @@ def root():
     return {"status": "success", "message": "Gaming Analytics API is running. Access the API at /api endpoints."}
 
 def process_analytics_task(task_id: int, db: Session):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    # Imported here so the generator is only loaded by processes that run tasks
+    from .data_generator import generate_game_statistics
+
+    # Claim atomically so each task runs once even with several worker processes;
+    # a task cancelled or deleted while queued is no longer pending and is skipped
+    claimed_at = datetime.now()
+    claimed = (
+        db.query(Task)
+        .filter(Task.id == task_id, Task.status == "pending")
+        .update({"status": "in_progress", "claimed_at": claimed_at})
+    )
+    if not claimed:
+        db.rollback()
         return
-    
-    task.status = "in_progress"
+    publish_status(db, task_id, "in_progress")
     db.commit()
+    task = db.query(Task).filter(Task.id == task_id).first()
+    # Only this claim may finish the task; it may be deleted, or requeued once the lease expires
+    still_claimed = db.query(Task).filter(
+        Task.id == task_id, Task.status == "in_progress", Task.claimed_at == claimed_at
+    )
     
     try:
-        processing_time = random.uniform(3, 5)  
-        time.sleep(processing_time)
+        time.sleep(simulated_latency(estimate_task_cost(task)))
         
         if task.game_type == 'custom':
             all_game_stats = []
@@ -74,78 +129,106 @@ def process_analytics_task(task_id: int, db: Session):
             )
         
         for stat in game_stats:
-            kills = stat.get("kills", 0)
-            deaths = stat.get("deaths", 0)
-            wins = stat.get("wins", 0)
-            losses = stat.get("losses", 0)
-
-            # Calculate K/D Ratio
-            if deaths > 0:
-                kd_ratio = float(kills) / deaths
-            elif kills > 0: # deaths is 0, kills > 0
-                kd_ratio = float(kills)
-            else: # kills is 0, deaths is 0
-                kd_ratio = 0.0
-
-            # Calculate Win Rate
-            total_games = wins + losses
-            if total_games > 0:
-                win_rate = float(wins) / total_games
-            else:
-                win_rate = 0.0
-
-            db_stat = GameStatistic(
-                task_id=task.id,
-                game=stat["game"],
-                character=stat["character"],
-                date=stat["date"], # Assuming date is always present and valid from generate_game_statistics
-                kills=kills,
-                deaths=deaths,
-                wins=wins,
-                losses=losses,
-                kd_ratio=kd_ratio,
-                win_rate=win_rate
-            )
-            db.add(db_stat)
+            db.add(build_game_statistic(task.id, stat))
         
-        task.status = "complete"
+        if not still_claimed.update({"status": "complete"}, synchronize_session=False):
+            db.rollback()
+            logging.info(f"Task {task_id} was deleted or requeued while processing; results discarded")
+            return
+        publish_status(db, task_id, "complete")
         db.commit()
     except Exception as e:
-        logging.exception(f"Error processing task {task_id}: {e}") # Changed to logging.exception
-        task.status = "failed"
+        db.rollback()
+        if still_claimed.update({"status": "failed"}, synchronize_session=False):
+            logging.exception(f"Error processing task {task_id}: {e}") # Changed to logging.exception
+            publish_status(db, task_id, "failed")
+        else:
+            logging.info(f"Task {task_id} was deleted or requeued while processing; results discarded")
         db.commit()
 
+def run_analytics_task(task_id: int, bind):
+    """Scheduler entry point; runs a task on its own session since the request session is closed by then"""
+    db = Session(bind=bind)
+    try:
+        process_analytics_task(task_id, db)
+    finally:
+        db.close()
+
+database_scheduler = DatabaseTaskScheduler(run_analytics_task, engine)
+
+def task_values(task: TaskCreate) -> dict:
+    """Column values for a new pending Task row"""
+    return {
+        "name": task.name,
+        "game_type": task.game_type,
+        "start_date": task.start_date,
+        "end_date": task.end_date,
+        "metrics": task.metrics,
+        "characters": task.characters,
+        "gameSources": task.gameSources or None,
+        "gameCharacters": task.gameCharacters or None,
+        "status": "pending",
+        "cost": estimate_task_cost(task),
+    }
+
+def enqueue_tasks(background_tasks: BackgroundTasks, tasks: List[Task], bind):
+    """Hand tasks to the scheduler once the response is sent; it orders work by estimated cost"""
+    if QUEUE_BACKEND == "database":
+        background_tasks.add_task(database_scheduler.wake)
+    else:
+        jobs = [(estimate_task_cost(task), run_analytics_task, (task.id, bind)) for task in tasks]
+        background_tasks.add_task(scheduler.submit_many, jobs)
+
 @app.post("/api/tasks", response_model=TaskResponse)
 def create_task(task: TaskCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Create a new analytics task"""
-    db_task = Task(
-        name=task.name,
-        game_type=task.game_type,
-        start_date=task.start_date,
-        end_date=task.end_date,
-        metrics=task.metrics,
-        characters=task.characters,
-        status="pending"
-    )
-    
-    if hasattr(task, 'gameSources') and task.gameSources:
-        db_task.gameSources = task.gameSources
-    
-    if hasattr(task, 'gameCharacters') and task.gameCharacters:
-        db_task.gameCharacters = task.gameCharacters
+    db_task = Task(**task_values(task))
     
     db.add(db_task)
+    db.flush()
+    publish_status(db, db_task.id, "pending")
     db.commit()
     db.refresh(db_task)
     
-    background_tasks.add_task(process_analytics_task, db_task.id, db)
+    enqueue_tasks(background_tasks, [db_task], db.get_bind())
     
     return db_task
 
+@app.post("/api/tasks/batch", response_model=BatchTaskResponse)
+def create_tasks_batch(payloads: List[Any], background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """Create many analytics tasks in one transaction; invalid items are reported without failing the rest"""
+    if len(payloads) > MAX_BATCH_TASKS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_TASKS} tasks can be created per batch")
+    
+    results = [BatchTaskResult(index=index) for index in range(len(payloads))]
+    valid = []
+    for index, payload in enumerate(payloads):
+        try:
+            valid.append((index, TaskCreate.model_validate(payload)))
+        except ValidationError as e:
+            results[index].errors = e.errors(include_url=False, include_context=False, include_input=False)
+    
+    if valid:
+        created = db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [task_values(task) for _, task in valid],
+        ).all()
+        publish_statuses(db, [task.id for task in created], "pending")
+        
+        # Read the rows before commit expires them, which would cost a SELECT per task
+        for (index, _), task in zip(valid, created):
+            results[index].task = TaskResponse.model_validate(task)
+        enqueue_tasks(background_tasks, created, db.get_bind())
+        db.commit()
+    
+    response = BatchTaskResponse(created=len(valid), failed=len(payloads) - len(valid), results=results)
+    return json_response(response.model_dump_json())
+
 @app.get("/api/tasks", response_model=List[TaskResponse])
 def get_tasks(db: Session = Depends(get_db)):
     """Get all tasks"""
-    return db.query(Task).all()
+    tasks = TaskResponseList.validate_python(db.query(Task).all(), from_attributes=True)
+    return json_response(TaskResponseList.dump_json(tasks))
 
 @app.get("/api/tasks/{task_id}", response_model=TaskResponse)
 def get_task(task_id: int, db: Session = Depends(get_db)):
@@ -166,6 +249,7 @@ def cancel_task(task_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Only pending tasks can be cancelled")
     
     task.status = "cancelled"
+    publish_status(db, task_id, "cancelled")
     db.commit()
     db.refresh(task)
     return task
@@ -179,8 +263,11 @@ def delete_task(task_id: int, db: Session):
     # Delete associated GameStatistic objects
     db.query(GameStatistic).filter(GameStatistic.task_id == task_id).delete()
 
+    cache_invalidate(db, task_id)
+
     # Delete the Task object
     db.delete(task)
+    publish_status(db, task_id, "deleted")
     db.commit()
 
 # New endpoint to delete a task
@@ -189,6 +276,19 @@ def delete_task_endpoint(task_id: int, db: Session = Depends(get_db)):
     delete_task(task_id, db)
     return JSONResponse(content={"message": "Task deleted successfully"}, status_code=200)
 
+RESULT_COLUMNS = (
+    GameStatistic.game,
+    GameStatistic.character,
+    GameStatistic.date,
+    GameStatistic.kills,
+    GameStatistic.deaths,
+    GameStatistic.wins,
+    GameStatistic.losses,
+    # Derived from the counts so results do not depend on the stored ratio columns
+    row_expression('kd_ratio').label("kd_ratio"),
+    row_expression('win_rate').label("win_rate"),
+)
+
 @app.get("/api/tasks/{task_id}/results", response_model=TaskResult)
 def get_task_results(
     task_id: int, 
@@ -205,6 +305,14 @@ def get_task_results(
     if task.status != "complete":
         raise HTTPException(status_code=400, detail="Task is not completed yet")
     
+    # Results of a completed task never change, so the full payload is cached for all
+    # workers. Filtered reads rarely repeat and would only add writes to every GET.
+    cached = not (start_date or end_date or (character and character != 'all'))
+    if cached:
+        payload = cache_get(db, str(task_id))
+        if payload is not None:
+            return json_response(payload)
+    
     query = db.query(GameStatistic).filter(GameStatistic.task_id == task_id)
     
     if start_date:
@@ -216,23 +324,25 @@ def get_task_results(
     if character and character != 'all':
         query = query.filter(GameStatistic.character == character)
     
-    stats = query.all()
-    
-    result_data = []
-    for stat in stats:
-        result_data.append({
-            "game": stat.game,
-            "character": stat.character,
-            "date": stat.date.strftime("%Y-%m-%d"),
-            "kills": stat.kills,
-            "deaths": stat.deaths,
-            "wins": stat.wins,
-            "losses": stat.losses,
-            "kd_ratio": stat.kd_ratio,
-            "win_rate": stat.win_rate
-        })
-    
-    return {"task_id": task_id, "data": result_data}
+    # Load plain rows rather than ORM instances; they validate straight into the schema
+    stats = query.with_entities(*RESULT_COLUMNS).all()
+    payload = TaskResult(task_id=task_id, data=stats).model_dump_json().encode("utf-8")
+    if cached:
+        cache_set(db, str(task_id), task_id, payload)
+    return json_response(payload)
+
+@app.post("/api/compare", response_model=CompareResponse)
+def compare_endpoint(request: CompareRequest, db: Session = Depends(get_db)):
+    """Aligned series of one metric across several completed tasks"""
+    from .compare import compare_tasks
+
+    return json_response(compare_tasks(db, request).model_dump_json())
+
+@app.get("/api/events", response_model=List[TaskEventResponse])
+def get_events(after: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """Task status changes after the given event id, from any worker process"""
+    return events_after(db, after, min(limit, 1000))
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
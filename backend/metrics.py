@@ -0,0 +1,124 @@
+import os
+from datetime import timedelta
+
+from sqlalchemy import Float, case, cast, func
+
+from .models import GameStatistic
+
+# Ratios are always derived from counts at query time; writing them to
+# game_statistics as well is only kept for older readers of the table
+STORE_DERIVED_RATIOS = os.environ.get("ANALYTICS_STORE_RATIOS", "1") == "1"
+
+# Metrics accepted by /api/compare: stored counts and ratios derived from them
+COUNT_METRICS = ['kills', 'deaths', 'wins', 'losses']
+RATIO_METRICS = ['kd_ratio', 'win_rate']
+
+
+def build_game_statistic(task_id: int, stat: dict) -> GameStatistic:
+    """Turn one generated daily stat into a GameStatistic row with derived ratios"""
+    kills = stat.get("kills", 0)
+    deaths = stat.get("deaths", 0)
+    wins = stat.get("wins", 0)
+    losses = stat.get("losses", 0)
+
+    # Calculate K/D Ratio
+    if deaths > 0:
+        kd_ratio = float(kills) / deaths
+    elif kills > 0: # deaths is 0, kills > 0
+        kd_ratio = float(kills)
+    else: # kills is 0, deaths is 0
+        kd_ratio = 0.0
+
+    # Calculate Win Rate
+    total_games = wins + losses
+    if total_games > 0:
+        win_rate = float(wins) / total_games
+    else:
+        win_rate = 0.0
+
+    if not STORE_DERIVED_RATIOS:
+        # Reads derive ratios from the counts, so the stored copies can stay empty
+        kd_ratio = win_rate = None
+
+    return GameStatistic(
+        task_id=task_id,
+        game=stat["game"],
+        character=stat["character"],
+        date=stat["date"], # Assuming date is always present and valid from generate_game_statistics
+        kills=kills,
+        deaths=deaths,
+        wins=wins,
+        losses=losses,
+        kd_ratio=kd_ratio,
+        win_rate=win_rate
+    )
+
+
+def derive(metric, kills, deaths, wins, losses):
+    """SQL expression for a metric from kills/deaths/wins/losses expressions.
+
+    The inputs may be plain columns, aggregates or window sums, so the same
+    definition serves per-row results, grouped totals and rolling windows.
+    """
+    if metric == 'kd_ratio':
+        # Same convention as build_game_statistic: kills alone when there are no deaths
+        return case((deaths > 0, cast(kills, Float) / deaths), else_=cast(kills, Float))
+    if metric == 'win_rate':
+        return case((wins + losses > 0, cast(wins, Float) / (wins + losses)), else_=0.0)
+    return {'kills': kills, 'deaths': deaths, 'wins': wins, 'losses': losses}[metric]
+
+
+def row_expression(metric):
+    """Metric for a single game_statistics row"""
+    return derive(metric, *(getattr(GameStatistic, name) for name in COUNT_METRICS))
+
+
+def aggregate_expression(metric):
+    """Metric over a GROUP BY, with ratios taken from summed counts rather than averaged"""
+    return derive(metric, *(func.sum(getattr(GameStatistic, name)) for name in COUNT_METRICS))
+
+
+def rolling_query(query, metric, window_days, start_date=None):
+    """Rolling window of a metric per task and day, computed with SQL window functions.
+
+    query must select from game_statistics with every filter except the start
+    date applied. Each output row holds the metric over the window_days
+    calendar days ending on that date; days with no rows still count towards
+    the window length. Rows before start_date feed the first windows but are
+    not returned.
+    """
+    if start_date:
+        query = query.filter(GameStatistic.date >= start_date - timedelta(days=window_days - 1))
+
+    daily = (
+        query.with_entities(
+            GameStatistic.task_id.label("task_id"),
+            GameStatistic.date.label("date"),
+            *(func.sum(getattr(GameStatistic, name)).label(name) for name in COUNT_METRICS),
+        )
+        .group_by(GameStatistic.task_id, GameStatistic.date)
+        .subquery()
+    )
+
+    window = {
+        "partition_by": daily.c.task_id,
+        "order_by": func.julianday(daily.c.date),
+        "range_": (-(window_days - 1), 0),
+    }
+    windowed = (
+        query.session.query(
+            daily.c.task_id,
+            daily.c.date,
+            *(func.sum(daily.c[name]).over(**window).label(name) for name in COUNT_METRICS),
+        )
+        .subquery()
+    )
+
+    rolling = query.session.query(
+        windowed.c.task_id,
+        func.strftime('%Y-%m-%d', windowed.c.date).label("key"),
+        derive(metric, *(windowed.c[name] for name in COUNT_METRICS)).label("value"),
+    )
+    if start_date:
+        rolling = rolling.filter(windowed.c.date >= start_date)
+    return rolling
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, JSON
+from sqlalchemy import Column, Index, Integer, String, Date, DateTime, Float, ForeignKey, JSON, LargeBinary, func, insert_sentinel
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -16,8 +16,20 @@ class Task(Base):
     gameSources = Column(JSON, nullable=True)  #List of game sources for advanced filtering
     gameCharacters = Column(JSON, nullable=True)  
     status = Column(String, nullable=False) 
+    # Set when a worker claims the task; claims older than the lease are treated as abandoned
+    claimed_at = Column(DateTime, nullable=True)
+    # scheduler.estimate_task_cost at creation, so the queue can be ordered in SQL
+    cost = Column(Integer, nullable=True)
+    # Client-side sentinel: lets a multi-row INSERT ... RETURNING report rows in payload
+    # order (sort_by_parameter_order) while staying one statement on SQLite
+    _sentinel = insert_sentinel("_sentinel")
     
     statistics = relationship("GameStatistic", back_populates="task")
+    
+    __table_args__ = (
+        # The database queue picks the cheapest pending task and counts running heavy ones
+        Index("ix_tasks_status_cost", "status", "cost"),
+    )
 
 
 class GameStatistic(Base):
@@ -34,7 +46,33 @@ class GameStatistic(Base):
     deaths = Column(Integer, default=0)
     wins = Column(Integer, default=0)
     losses = Column(Integer, default=0)
-    kd_ratio = Column(Float, default=0.0)
-    win_rate = Column(Float, default=0.0)
+    # Optional copies of ratios that reads derive from the counts (see metrics.STORE_DERIVED_RATIOS)
+    kd_ratio = Column(Float, nullable=True)
+    win_rate = Column(Float, nullable=True)
     
     task = relationship("Task", back_populates="statistics")
+    
+    __table_args__ = (
+        # Results, compare and rolling-window queries all filter by task and date
+        Index("ix_game_statistics_task_id_date", "task_id", "date"),
+    )
+
+
+class TaskEvent(Base):
+    """Task status change, shared by every worker process through the database"""
+    __tablename__ = "task_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, nullable=False, index=True)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class ResultCacheEntry(Base):
+    """Serialized results payload, shared by every worker process through the database"""
+    __tablename__ = "result_cache"
+    
+    key = Column(String, primary_key=True)
+    task_id = Column(Integer, nullable=False, index=True)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
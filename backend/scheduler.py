@@ -0,0 +1,134 @@
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+
+# Scheduler settings, overridable through the environment
+WORKER_COUNT = int(os.environ.get("ANALYTICS_WORKERS", "4"))
+MAX_HEAVY_TASKS = int(os.environ.get("ANALYTICS_MAX_HEAVY_TASKS", "1"))
+HEAVY_TASK_COST = int(os.environ.get("ANALYTICS_HEAVY_TASK_COST", "1000"))
+# Light jobs that may start ahead of a queued heavy job before it is run next regardless
+HEAVY_BYPASS_LIMIT = int(os.environ.get("ANALYTICS_HEAVY_BYPASS_LIMIT", "8"))
+
+# "memory" keeps the queue in this process; "database" shares it across worker processes
+QUEUE_BACKEND = os.environ.get("ANALYTICS_QUEUE_BACKEND", "memory")
+QUEUE_POLL_INTERVAL = float(os.environ.get("ANALYTICS_QUEUE_POLL_INTERVAL", "0.5"))
+
+# Simulated processing latency: base + per_unit * cost + uniform(0, jitter) seconds.
+# Set all three to 0 for benchmarks.
+LATENCY_BASE = float(os.environ.get("ANALYTICS_LATENCY_BASE", "3"))
+LATENCY_PER_UNIT = float(os.environ.get("ANALYTICS_LATENCY_PER_UNIT", "0"))
+LATENCY_JITTER = float(os.environ.get("ANALYTICS_LATENCY_JITTER", "2"))
+
+# Average characters per game per day when no character filter is given
+DEFAULT_CHARACTERS_PER_GAME = 2
+
+
+def estimate_task_cost(task):
+    """Estimate the work for a task as days x games x characters"""
+    days = (task.end_date - task.start_date).days + 1
+
+    if task.game_type == 'custom':
+        game_characters = task.gameCharacters or {}
+        per_day = sum(
+            len(game_characters.get(source) or []) or DEFAULT_CHARACTERS_PER_GAME
+            for source in (task.gameSources or [])
+        )
+    elif task.game_type == 'all':
+        from .data_generator import SUPPORTED_GAMES
+        per_day = len(SUPPORTED_GAMES) * DEFAULT_CHARACTERS_PER_GAME
+    else:
+        per_day = len(task.characters or []) or DEFAULT_CHARACTERS_PER_GAME
+
+    return max(1, days * per_day)
+
+
+def simulated_latency(cost):
+    """Seconds of simulated processing time for a task of the given cost"""
+    latency = LATENCY_BASE + LATENCY_PER_UNIT * cost
+    if LATENCY_JITTER > 0:
+        latency += random.uniform(0, LATENCY_JITTER)
+    return latency
+
+
+class TaskScheduler:
+    """Shortest-job-first worker pool with a cap on concurrent heavy tasks.
+
+    Light jobs go first, but once bypass_limit of them have started while a
+    heavy job was queued, the heavy job runs as soon as a heavy slot is free.
+    """
+
+    def __init__(self, workers=WORKER_COUNT, max_heavy=MAX_HEAVY_TASKS, heavy_cost=HEAVY_TASK_COST,
+                 bypass_limit=HEAVY_BYPASS_LIMIT):
+        self.workers = max(1, workers)
+        self.max_heavy = max(1, min(max_heavy, self.workers))
+        self.heavy_cost = heavy_cost
+        self.bypass_limit = bypass_limit
+        self._light = []
+        self._heavy = []
+        self._heavy_running = 0
+        self._bypassed = 0
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def submit(self, cost, func, *args):
+        """Queue func(*args) with the given estimated cost"""
+        self.submit_many([(cost, func, args)])
+
+    def submit_many(self, jobs):
+        """Queue (cost, func, args) jobs under a single lock acquisition"""
+        with self._cond:
+            for cost, func, args in jobs:
+                entry = (cost, next(self._counter), func, args)
+                heapq.heappush(self._heavy if cost >= self.heavy_cost else self._light, entry)
+            self._start_workers()
+            self._cond.notify_all()
+
+    def pending(self):
+        """Number of queued jobs that have not started yet"""
+        with self._cond:
+            return len(self._light) + len(self._heavy)
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._run, name=f"analytics-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self):
+        """Pop the cheapest runnable job, or a starved heavy one; must be called with the lock held"""
+        heavy_ready = self._heavy and self._heavy_running < self.max_heavy
+        if self._light and not (heavy_ready and self._bypassed >= self.bypass_limit):
+            if self._heavy:
+                self._bypassed += 1
+            return heapq.heappop(self._light), False
+        if heavy_ready:
+            self._heavy_running += 1
+            self._bypassed = 0
+            return heapq.heappop(self._heavy), True
+        return None, False
+
+    def _run(self):
+        while True:
+            with self._cond:
+                entry, heavy = self._next_job()
+                while entry is None:
+                    self._cond.wait()
+                    entry, heavy = self._next_job()
+
+            _, _, func, args = entry
+            try:
+                func(*args)
+            except Exception:
+                logging.exception("Unhandled error in scheduled job")
+            finally:
+                if heavy:
+                    with self._cond:
+                        self._heavy_running -= 1
+                        self._cond.notify()
+
+
+scheduler = TaskScheduler()
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field, validator, root_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationInfo, field_validator, model_serializer, model_validator
 from typing import List, Optional, Dict, Any
-from datetime import date
+from datetime import date, datetime
+
+from .metrics import COUNT_METRICS, RATIO_METRICS
 
 class TaskBase(BaseModel):
     """Base schema for Task"""
@@ -13,20 +15,23 @@ class TaskBase(BaseModel):
     gameSources: Optional[List[str]] = []
     gameCharacters: Optional[Dict[str, List[str]]] = {}
     
-    @validator('end_date')
-    def end_date_must_be_after_start_date(cls, v, values):
-        if 'start_date' in values and v < values['start_date']:
+    @field_validator('end_date')
+    @classmethod
+    def end_date_must_be_after_start_date(cls, v, info: ValidationInfo):
+        if 'start_date' in info.data and v < info.data['start_date']:
             raise ValueError('end_date must be after start_date')
         return v
     
-    @validator('game_type')
+    @field_validator('game_type')
+    @classmethod
     def validate_game_type(cls, v):
         valid_game_types = ['all', 'valorant', 'overwatch', 'league_of_legends', 'apex_legends', 'fortnite', 'custom']
         if v not in valid_game_types:
             raise ValueError(f'game_type must be one of {valid_game_types}')
         return v
     
-    @validator('metrics')
+    @field_validator('metrics')
+    @classmethod
     def validate_metrics(cls, v):
         valid_metrics = ['kills', 'deaths', 'wins', 'losses', 'kd_ratio', 'win_rate'] # Added 'losses'
         for metric in v:
@@ -34,27 +39,23 @@ class TaskBase(BaseModel):
                 raise ValueError(f'metrics must contain only valid values: {valid_metrics}')
         return v
         
-    @root_validator(skip_on_failure=True)
-    def validate_custom_game_type(cls, values):
-        game_type = values.get('game_type')
-        game_sources = values.get('gameSources', [])
-        
-        if game_type == 'custom' and not game_sources:
+    @model_validator(mode='after')
+    def validate_custom_game_type(self):
+        if self.game_type == 'custom' and not self.gameSources:
             raise ValueError('gameSources must be provided when game_type is "custom"')
             
-        return values
+        return self
 
-    @root_validator(skip_on_failure=True)
-    def validate_characters_for_specific_games(cls, values):
-        game_type = values.get('game_type')
-        characters = values.get('characters') # Will be an empty list by default if not provided
+    @model_validator(mode='after')
+    def validate_characters_for_specific_games(self):
+        characters = self.characters # Will be an empty list by default if not provided
 
-        if game_type in ['valorant', 'overwatch']:
+        if self.game_type in ['valorant', 'overwatch']:
             if not characters: # Checks for None or empty list
                 raise ValueError(
                     "Characters must be provided for Valorant or Overwatch tasks and cannot be empty."
                 )
-        return values
+        return self
 
 class TaskCreate(TaskBase):
     """Schema for creating a new Task"""
@@ -62,17 +63,39 @@ class TaskCreate(TaskBase):
 
 class TaskResponse(TaskBase):
     """Schema for Task response"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     status: str
-    
-    class Config:
-        orm_mode = True
+
+class BatchTaskResult(BaseModel):
+    """Outcome for one item of a batch create, in request order"""
+    index: int
+    task: Optional[TaskResponse] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+    @model_serializer(mode='wrap')
+    def omit_missing_outcome(self, handler):
+        # Each item carries either task or errors; nested task fields keep their nulls
+        data = handler(self)
+        for key in ('task', 'errors'):
+            if data.get(key) is None:
+                data.pop(key, None)
+        return data
+
+class BatchTaskResponse(BaseModel):
+    """Schema for batch task creation"""
+    created: int
+    failed: int
+    results: List[BatchTaskResult]
 
 class GameStatisticBase(BaseModel):
     """Base schema for game statistics data"""
+    model_config = ConfigDict(from_attributes=True)
+
     game: str
     character: Optional[str] = None
-    date: str
+    date: date
     kills: Optional[int] = 0
     deaths: Optional[int] = 0
     wins: Optional[int] = 0
@@ -82,8 +105,71 @@ class GameStatisticBase(BaseModel):
 
 class TaskResult(BaseModel):
     """Schema for task results"""
+    model_config = ConfigDict(from_attributes=True)
+
     task_id: int
     data: List[GameStatisticBase] # This line is updated
-    
-    class Config:
-        orm_mode = True
+
+class TaskEventResponse(BaseModel):
+    """Schema for task status change events"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    task_id: int
+    status: str
+    created_at: datetime
+
+class CompareRequest(BaseModel):
+    """Schema for comparing several tasks on one metric"""
+    task_ids: List[int] = Field(min_length=1)
+    metric: str
+    group_by: str = 'date'
+    window: Optional[int] = Field(default=None, ge=1, le=365)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    game: Optional[str] = None
+    character: Optional[str] = None
+
+    @field_validator('task_ids')
+    @classmethod
+    def task_ids_must_be_unique(cls, v):
+        if len(set(v)) != len(v):
+            raise ValueError('task_ids must not contain duplicates')
+        return v
+
+    @field_validator('metric')
+    @classmethod
+    def validate_metric(cls, v):
+        valid_metrics = COUNT_METRICS + RATIO_METRICS
+        if v not in valid_metrics:
+            raise ValueError(f'metric must be one of {valid_metrics}')
+        return v
+
+    @field_validator('group_by')
+    @classmethod
+    def validate_group_by(cls, v):
+        valid_groupings = ['date', 'week', 'month', 'game', 'character']
+        if v not in valid_groupings:
+            raise ValueError(f'group_by must be one of {valid_groupings}')
+        return v
+
+    @model_validator(mode='after')
+    def window_requires_date_grouping(self):
+        if self.window and self.group_by != 'date':
+            raise ValueError('window (rolling days) can only be used with group_by "date"')
+        return self
+
+class CompareSeries(BaseModel):
+    """Values for one task, aligned with CompareResponse.keys"""
+    task_id: int
+    values: List[Optional[float]]
+
+class CompareResponse(BaseModel):
+    """Schema for aligned series across tasks"""
+    metric: str
+    group_by: str
+    keys: List[str]
+    series: List[CompareSeries]
+
+# Reusable adapters for serializing straight from ORM rows without FastAPI's re-validation
+TaskResponseList = TypeAdapter(List[TaskResponse])
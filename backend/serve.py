@@ -0,0 +1,46 @@
+"""Production entry point: several uvicorn worker processes sharing one database.
+
+Run from the repository root:
+
+    python -m backend.serve --workers 4 --port 8000
+
+The task queue, status events and result cache all live in the database, so
+any worker can answer any request and every worker processes queued tasks.
+"""
+import argparse
+import os
+
+import uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    # Worker processes inherit the environment, so they all use the shared queue
+    os.environ.setdefault("ANALYTICS_QUEUE_BACKEND", "database")
+
+    # Create the schema once here so the workers' startup check finds it current
+    from .database import SessionLocal, ensure_schema
+    from .shared_state import requeue_stale_claims
+    ensure_schema()
+
+    # No worker is running yet, so every in-progress claim was left by a previous run
+    with SessionLocal() as db:
+        requeue_stale_claims(db, lease_seconds=0)
+
+    uvicorn.run(
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, literal_column, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from .models import Task, TaskEvent, ResultCacheEntry
+from .scheduler import (
+    WORKER_COUNT,
+    MAX_HEAVY_TASKS,
+    HEAVY_TASK_COST,
+    HEAVY_BYPASS_LIMIT,
+    QUEUE_POLL_INTERVAL,
+)
+
+# State shared between worker processes lives in the application database
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("ANALYTICS_RESULT_CACHE_BYTES", str(64 * 1024 * 1024)))
+TASK_EVENT_RETENTION = int(os.environ.get("ANALYTICS_EVENT_RETENTION", "10000"))
+# A claimed task not finished within this many seconds is assumed abandoned by its worker
+TASK_LEASE_SECONDS = float(os.environ.get("ANALYTICS_TASK_LEASE_SECONDS", "3600"))
+
+
+def publish_status(db: Session, task_id: int, status: str):
+    """Record a task status change; committed with the caller's transaction"""
+    publish_statuses(db, [task_id], status)
+
+
+def publish_statuses(db: Session, task_ids, status: str):
+    """Record the same status change for several tasks in one statement"""
+    db.execute(insert(TaskEvent), [{"task_id": task_id, "status": status} for task_id in task_ids])
+    newest = select(func.max(TaskEvent.id)).scalar_subquery()
+    db.execute(delete(TaskEvent).where(TaskEvent.id <= newest - TASK_EVENT_RETENTION))
+
+
+def events_after(db: Session, after_id: int, limit: int = 100):
+    """Status changes newer than after_id, oldest first"""
+    return (
+        db.query(TaskEvent)
+        .filter(TaskEvent.id > after_id)
+        .order_by(TaskEvent.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def cache_get(db: Session, key: str):
+    """Cached payload for key, or None"""
+    return db.execute(
+        select(ResultCacheEntry.payload).where(ResultCacheEntry.key == key)
+    ).scalar_one_or_none()
+
+
+def cache_set(db: Session, key: str, task_id: int, payload: bytes):
+    """Store a payload, evicting the oldest entries once the cache exceeds RESULT_CACHE_MAX_BYTES"""
+    if len(payload) > RESULT_CACHE_MAX_BYTES:
+        return
+    # Another process may have filled the same key first; both payloads are identical
+    db.execute(
+        insert(ResultCacheEntry)
+        .values(key=key, task_id=task_id, payload=payload)
+        .on_conflict_do_nothing(index_elements=["key"])
+    )
+    # rowid follows insertion order, unlike created_at which only has second resolution
+    newest_first = (
+        select(
+            ResultCacheEntry.key,
+            func.sum(func.length(ResultCacheEntry.payload))
+            .over(order_by=literal_column("rowid").desc())
+            .label("total"),
+        )
+        .subquery()
+    )
+    overflow = select(newest_first.c.key).where(newest_first.c.total > RESULT_CACHE_MAX_BYTES)
+    db.execute(delete(ResultCacheEntry).where(ResultCacheEntry.key.in_(overflow)))
+    db.commit()
+
+
+def cache_invalidate(db: Session, task_id: int):
+    """Drop cached payloads for a task; committed with the caller's transaction"""
+    db.query(ResultCacheEntry).filter(ResultCacheEntry.task_id == task_id).delete()
+
+
+def requeue_stale_claims(db: Session, lease_seconds: float = TASK_LEASE_SECONDS):
+    """Return in-progress tasks whose claim is older than the lease to the queue; returns their ids.
+
+    Pass lease_seconds=0 at startup, before any worker runs, to requeue every
+    claim left behind by a stopped or crashed process.
+    """
+    cutoff = datetime.now() - timedelta(seconds=lease_seconds)
+    stale = [
+        task_id for task_id, in db.query(Task.id).filter(
+            Task.status == "in_progress",
+            (Task.claimed_at == None) | (Task.claimed_at <= cutoff),  # noqa: E711
+        )
+    ]
+    if stale:
+        # Filtered again so a task finished in the meantime is left alone
+        db.query(Task).filter(Task.id.in_(stale), Task.status == "in_progress").update(
+            {"status": "pending", "claimed_at": None}, synchronize_session=False
+        )
+        publish_statuses(db, stale, "pending")
+        db.commit()
+        logging.warning(f"Requeued tasks with expired claims: {stale}")
+    return stale
+
+
+def next_pending_task(db: Session, heavy_cost: int = HEAVY_TASK_COST, max_heavy: int = MAX_HEAVY_TASKS,
+                      bypass_limit: int = HEAVY_BYPASS_LIMIT):
+    """Id of the cheapest pending task that may start now, or None.
+
+    The oldest pending heavy task goes first once bypass_limit tasks created
+    after it have started, so a stream of light tasks cannot starve it.
+    """
+    pending = db.query(Task.id).filter(Task.status == "pending")
+    cheapest_first = (Task.cost, Task.id)
+
+    heavy_running = (
+        db.query(func.count(Task.id))
+        .filter(Task.status == "in_progress", Task.cost >= heavy_cost)
+        .scalar()
+    )
+    if heavy_running >= max_heavy:
+        return pending.filter(Task.cost < heavy_cost).order_by(*cheapest_first).limit(1).scalar()
+
+    oldest_heavy = db.query(func.min(Task.id)).filter(Task.status == "pending", Task.cost >= heavy_cost).scalar()
+    if oldest_heavy is not None:
+        overtaken = (
+            db.query(Task.id)
+            .filter(Task.id > oldest_heavy, Task.status.in_(["in_progress", "complete", "failed"]))
+            .limit(bypass_limit)
+            .count()
+        )
+        if overtaken >= bypass_limit:
+            return oldest_heavy
+
+    return pending.order_by(*cheapest_first).limit(1).scalar()
+
+
+class DatabaseTaskScheduler:
+    """Worker pool that pulls pending tasks from the tasks table, so every process shares one queue"""
+
+    def __init__(self, runner, bind, workers=WORKER_COUNT, max_heavy=MAX_HEAVY_TASKS,
+                 heavy_cost=HEAVY_TASK_COST, bypass_limit=HEAVY_BYPASS_LIMIT, poll_interval=QUEUE_POLL_INTERVAL,
+                 lease_seconds=TASK_LEASE_SECONDS):
+        self.runner = runner
+        self.bind = bind
+        self.workers = max(1, workers)
+        self.max_heavy = max(1, min(max_heavy, self.workers))
+        self.heavy_cost = heavy_cost
+        self.bypass_limit = bypass_limit
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads; safe to call more than once"""
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name=f"analytics-db-worker-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def wake(self):
+        """Poll the queue now instead of waiting for the next interval"""
+        self.start()
+        self._wake.set()
+
+    def stop(self):
+        """Let the worker threads exit once their current task finishes"""
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                with Session(bind=self.bind) as db:
+                    requeue_stale_claims(db, self.lease_seconds)
+                    task_id = next_pending_task(db, self.heavy_cost, self.max_heavy, self.bypass_limit)
+                if task_id is None:
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+                    continue
+                # The runner claims the task atomically; losing the race to another worker is a no-op
+                self.runner(task_id, self.bind)
+            except Exception:
+                logging.exception("Unhandled error in database task worker")
+                self._wake.wait(self.poll_interval)
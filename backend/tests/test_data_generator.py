@@ -0,0 +1,27 @@
+import random
+from datetime import date
+
+from backend.data_generator import generate_game_statistics
+
+
+def generate(seed, game_type="all", characters=None):
+    return generate_game_statistics(
+        game_type, date(2024, 1, 1), date(2024, 3, 31), ["kills"], characters, rng=random.Random(seed)
+    )
+
+
+def test_same_seed_gives_identical_statistics():
+    assert generate(42) == generate(42)
+    assert generate(42, "valorant", ["Jett", "Sage"]) == generate(42, "valorant", ["Jett", "Sage"])
+
+
+def test_different_seeds_differ():
+    assert generate(1) != generate(2)
+
+
+def test_seeded_generation_leaves_global_random_untouched():
+    random.seed(123)
+    expected = random.random()
+    random.seed(123)
+    generate(42)
+    assert random.random() == expected
@@ -0,0 +1,58 @@
+import argparse
+import random
+
+import pytest
+
+from backend.benchmarks.loadgen import MAX_TASK_DAYS, build_plan, parse_distribution, parse_mix, random_task
+
+KNOWN_TASKS = [
+    {"id": 1, "start_date": "2024-01-01", "end_date": "2024-03-31", "characters": ["Jett"]},
+    {"id": 2, "start_date": "2023-06-01", "end_date": "2024-06-01", "characters": []},
+]
+
+
+def plan(seed):
+    return build_plan(
+        random.Random(seed), parse_mix("create=1,poll=4,results=4,delete=1"), rate=200, duration=2,
+        known_tasks=KNOWN_TASKS, days_dist=parse_distribution("lognormal:30:1.0"), all_fraction=0.2,
+    )
+
+
+def test_same_seed_gives_identical_tasks():
+    days = parse_distribution("uniform:1:400")
+    first = [random_task(random.Random(7), days, 0.3) for _ in range(3)]
+    second = [random_task(random.Random(7), days, 0.3) for _ in range(3)]
+    assert first == second
+
+    rng = random.Random(7)
+    tasks = [random_task(rng, days, 0.3) for _ in range(50)]
+    assert tasks != [random_task(random.Random(8), days, 0.3) for _ in range(50)]
+    assert all(1 <= (t["end_date"] - t["start_date"]).days + 1 <= 400 for t in tasks)
+
+
+def test_same_seed_gives_identical_plan():
+    assert plan(42) == plan(42)
+    assert plan(42) != plan(43)
+    # ~200/s for 2s of Poisson arrivals, in send order
+    offsets = [offset for offset, _, _ in plan(42)]
+    assert 300 < len(offsets) < 500
+    assert offsets == sorted(offsets) and offsets[-1] < 2
+
+
+def test_parse_distribution_clamps_samples():
+    rng = random.Random(1)
+    assert parse_distribution("fixed:10")(rng) == 10
+    assert parse_distribution("fixed:0")(rng) == 1
+    assert parse_distribution("fixed:99999")(rng) == MAX_TASK_DAYS
+
+
+@pytest.mark.parametrize("spec", ["fixed", "fixed:1:2", "uniform:5", "lognormal:30", "normal:1:2", "fixed:abc"])
+def test_parse_distribution_rejects_bad_specs(spec):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_distribution(spec)
+
+
+def test_parse_mix_rejects_unknown_operations():
+    assert parse_mix("create=1,poll=4") == {"create": 1.0, "poll": 4.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("create=1,update=2")
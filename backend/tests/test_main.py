@@ -1,13 +1,14 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 
-from backend.main import app  # Assuming app is in backend.main
+from backend.main import app, process_analytics_task  # Assuming app is in backend.main
 from backend.database import Base, get_db
-from backend.models import Task, GameStatistic
+from backend.models import Task, GameStatistic, TaskEvent, ResultCacheEntry
 from backend.schemas import TaskCreate # For creating tasks if needed
+from backend.compare import windowed_cost
 from unittest.mock import patch
 import time
 import logging
@@ -101,11 +102,15 @@ def test_read_root():
     assert response.json() == {"status": "success", "message": "Gaming Analytics API is running. Access the API at /api endpoints."}
 
 
-@patch('backend.main.generate_game_statistics')
-def test_process_task_failure_and_logging(mock_generate_stats, caplog):
+@patch('backend.data_generator.generate_game_statistics')
+def test_process_task_failure_and_logging(mock_generate_stats, caplog, monkeypatch):
     # Configure the mock to raise an exception
     mock_generate_stats.side_effect = Exception("Simulated processing error")
 
+    # Disable simulated latency so the scheduler runs the task immediately
+    monkeypatch.setattr("backend.scheduler.LATENCY_BASE", 0)
+    monkeypatch.setattr("backend.scheduler.LATENCY_JITTER", 0)
+
     # Set logging level for caplog to capture ERROR messages
     caplog.set_level(logging.ERROR)
 
@@ -151,6 +156,64 @@ def test_process_task_failure_and_logging(mock_generate_stats, caplog):
     assert "Simulated processing error" in str(error_log_record.exc_info[1])
 
 
+@patch('backend.data_generator.generate_game_statistics')
+def test_process_task_deleted_while_running(mock_generate_stats, monkeypatch):
+    monkeypatch.setattr("backend.scheduler.LATENCY_BASE", 0)
+    monkeypatch.setattr("backend.scheduler.LATENCY_JITTER", 0)
+
+    db = TestingSessionLocal()
+    task = Task(name="Deleted Mid-Run", game_type="apex_legends", status="pending",
+                start_date=date(2024, 1, 1), end_date=date(2024, 1, 2), metrics=["kills"])
+    db.add(task)
+    db.commit()
+    task_id = task.id
+    db.close()
+
+    def delete_task_row(*args, **kwargs):
+        with TestingSessionLocal() as other:
+            other.query(Task).filter(Task.id == task_id).delete()
+            other.commit()
+        return []
+
+    mock_generate_stats.side_effect = delete_task_row
+
+    # The completing commit hits a deleted row; marking failure must not raise again
+    db = TestingSessionLocal()
+    process_analytics_task(task_id, db)
+    assert db.query(Task).filter(Task.id == task_id).count() == 0
+    assert [e.status for e in db.query(TaskEvent).filter(TaskEvent.task_id == task_id)] == ["in_progress"]
+    db.close()
+
+
+@patch('backend.data_generator.generate_game_statistics')
+def test_process_task_discards_results_after_claim_is_requeued(mock_generate_stats, monkeypatch):
+    monkeypatch.setattr("backend.scheduler.LATENCY_BASE", 0)
+    monkeypatch.setattr("backend.scheduler.LATENCY_JITTER", 0)
+
+    db = TestingSessionLocal()
+    task = Task(name="Requeued Mid-Run", game_type="apex_legends", status="pending",
+                start_date=date(2024, 1, 1), end_date=date(2024, 1, 1), metrics=["kills"])
+    db.add(task)
+    db.commit()
+    task_id = task.id
+    db.close()
+
+    def requeue_and_generate(*args, **kwargs):
+        # The lease expired and the task went back to the queue while this worker ran
+        with TestingSessionLocal() as other:
+            other.query(Task).filter(Task.id == task_id).update({"status": "pending", "claimed_at": None})
+            other.commit()
+        return [{"game": "apex", "character": "Wraith", "date": date(2024, 1, 1), "kills": 1}]
+
+    mock_generate_stats.side_effect = requeue_and_generate
+
+    db = TestingSessionLocal()
+    process_analytics_task(task_id, db)
+    assert db.get(Task, task_id).status == "pending"
+    assert db.query(GameStatistic).filter(GameStatistic.task_id == task_id).count() == 0
+    db.close()
+
+
 # Base payload for creating tasks in API tests
 API_BASE_TASK_PAYLOAD = {
     "name": "API Test Task",
@@ -235,3 +298,237 @@ def test_create_task_other_game_type_empty_characters_succeeds():
     assert response_json["characters"] == []
     assert response_json["status"] == "pending"
 
+
+def test_get_task_results_serializes_rows_and_compresses():
+    db = TestingSessionLocal()
+    task = Task(
+        name="Results Task",
+        game_type="apex_legends",
+        status="complete",
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 1, 31),
+        metrics=["kills", "deaths"]
+    )
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    task_id = task.id
+    db.add_all([
+        GameStatistic(task_id=task_id, game="apex", character="Wraith", date=date(2024, 1, day),
+                      kills=6, deaths=3, wins=2, losses=1, kd_ratio=2.0, win_rate=2 / 3)
+        for day in range(1, 32)
+    ])
+    db.commit()
+    db.close()
+
+    response = client.get(f"/api/tasks/{task_id}/results", params={"start_date": "2024-01-10"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    body = response.json()
+    assert body["task_id"] == task_id
+    assert len(body["data"]) == 22
+    assert body["data"][0] == {
+        "game": "apex", "character": "Wraith", "date": "2024-01-10",
+        "kills": 6, "deaths": 3, "wins": 2, "losses": 1, "kd_ratio": 2.0, "win_rate": 2 / 3
+    }
+
+    # Only unfiltered results are cached, so filtered reads never write
+    db = TestingSessionLocal()
+    assert db.query(ResultCacheEntry).count() == 0
+    response = client.get(f"/api/tasks/{task_id}/results", params={"character": "all"})
+    assert len(response.json()["data"]) == 31
+    assert [key for key, in db.query(ResultCacheEntry.key)] == [str(task_id)]
+    db.close()
+
+def add_complete_task_with_stats(db, stats):
+    task = Task(
+        name="Compare Task",
+        game_type="custom",
+        status="complete",
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 1, 31),
+        metrics=["kills", "deaths"],
+        gameSources=["valorant", "overwatch"]
+    )
+    db.add(task)
+    db.commit()
+    db.add_all(GameStatistic(task_id=task.id, **stat) for stat in stats)
+    db.commit()
+    return task.id
+
+def test_compare_tasks_aligns_series_and_derives_ratios():
+    db = TestingSessionLocal()
+    first = add_complete_task_with_stats(db, [
+        {"game": "valorant", "character": "Jett", "date": date(2024, 1, 1), "kills": 10, "deaths": 5, "wins": 1, "losses": 1},
+        {"game": "overwatch", "character": "Ana", "date": date(2024, 1, 1), "kills": 2, "deaths": 5, "wins": 0, "losses": 1},
+        {"game": "valorant", "character": "Jett", "date": date(2024, 1, 2), "kills": 4, "deaths": 0, "wins": 1, "losses": 0},
+    ])
+    second = add_complete_task_with_stats(db, [
+        {"game": "valorant", "character": "Sage", "date": date(2024, 1, 3), "kills": 9, "deaths": 3, "wins": 2, "losses": 2},
+    ])
+    db.close()
+
+    response = client.post("/api/compare", json={"task_ids": [second, first], "metric": "kd_ratio"})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "metric": "kd_ratio",
+        "group_by": "date",
+        "keys": ["2024-01-01", "2024-01-02", "2024-01-03"],
+        "series": [
+            {"task_id": second, "values": [None, None, 3.0]},
+            # 12 kills / 10 deaths summed across games, not the mean of 2.0 and 0.4
+            {"task_id": first, "values": [1.2, 4.0, None]},
+        ],
+    }
+
+    response = client.post("/api/compare", json={
+        "task_ids": [first, second], "metric": "kills", "group_by": "game", "game": "valorant"
+    })
+    assert response.json()["keys"] == ["valorant"]
+    assert [s["values"] for s in response.json()["series"]] == [[14.0], [9.0]]
+
+def test_compare_tasks_groups_weeks_by_monday_across_new_year():
+    db = TestingSessionLocal()
+    task_id = add_complete_task_with_stats(db, [
+        {"game": "valorant", "character": "Jett", "date": date(2023, 12, 31), "kills": 1, "deaths": 1, "wins": 0, "losses": 1},
+        {"game": "valorant", "character": "Jett", "date": date(2024, 1, 1), "kills": 2, "deaths": 1, "wins": 1, "losses": 0},
+        {"game": "valorant", "character": "Jett", "date": date(2024, 12, 30), "kills": 3, "deaths": 1, "wins": 1, "losses": 0},
+        {"game": "valorant", "character": "Jett", "date": date(2025, 1, 5), "kills": 4, "deaths": 1, "wins": 1, "losses": 0},
+    ])
+    db.close()
+
+    response = client.post("/api/compare", json={"task_ids": [task_id], "metric": "kills", "group_by": "week"})
+
+    assert response.status_code == 200
+    # Sunday 2023-12-31 belongs to the week of Monday 2023-12-25; 2024-12-30..2025-01-05 is one week
+    assert response.json()["keys"] == ["2023-12-25", "2024-01-01", "2024-12-30"]
+    assert response.json()["series"][0]["values"] == [1.0, 2.0, 7.0]
+
+def test_windowed_cost_counts_rolling_lookback_days():
+    task = Task(game_type="apex_legends", characters=[], start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    # 2 characters a day by default; 31 requested days plus 29 days of lookback
+    assert windowed_cost(task, date(2024, 3, 1), date(2024, 3, 31)) == 62
+    assert windowed_cost(task, date(2024, 3, 1), date(2024, 3, 31), lookback_days=29) == 120
+    # Lookback never reaches before the task's own data
+    assert windowed_cost(task, date(2024, 1, 5), date(2024, 1, 5), lookback_days=29) == 10
+
+def test_compare_tasks_rejects_missing_incomplete_and_oversized():
+    db = TestingSessionLocal()
+    complete_id = add_complete_task_with_stats(db, [])
+    pending = Task(name="Pending", game_type="all", status="pending", metrics=["kills"],
+                   start_date=date(2024, 1, 1), end_date=date(2024, 1, 2))
+    huge = Task(name="Huge", game_type="all", status="complete", metrics=["kills"],
+                start_date=date(1900, 1, 1), end_date=date(2024, 12, 31))
+    db.add_all([pending, huge])
+    db.commit()
+    pending_id, huge_id = pending.id, huge.id
+    db.close()
+
+    response = client.post("/api/compare", json={"task_ids": [complete_id, 99999], "metric": "kills"})
+    assert response.status_code == 404
+
+    response = client.post("/api/compare", json={"task_ids": [complete_id, pending_id], "metric": "kills"})
+    assert response.status_code == 400
+
+    response = client.post("/api/compare", json={"task_ids": [huge_id], "metric": "kills"})
+    assert response.status_code == 400
+    assert "too large" in response.json()["detail"]
+
+    response = client.post("/api/compare", json={
+        "task_ids": [huge_id], "metric": "kills", "start_date": "2024-01-01", "end_date": "2024-01-31"
+    })
+    assert response.status_code == 200
+
+    response = client.post("/api/compare", json={"task_ids": [complete_id], "metric": "headshots"})
+    assert response.status_code == 422
+
+def test_compare_tasks_rolling_window_sums_counts_over_calendar_days():
+    db = TestingSessionLocal()
+    task_id = add_complete_task_with_stats(db, [
+        {"game": "valorant", "character": "Jett", "date": date(2024, 1, 1), "kills": 10, "deaths": 5, "wins": 1, "losses": 0},
+        {"game": "valorant", "character": "Jett", "date": date(2024, 1, 2), "kills": 4, "deaths": 0, "wins": 0, "losses": 1},
+        {"game": "valorant", "character": "Jett", "date": date(2024, 1, 4), "kills": 6, "deaths": 3, "wins": 1, "losses": 1},
+    ])
+    db.close()
+
+    response = client.post("/api/compare", json={
+        "task_ids": [task_id], "metric": "kd_ratio", "window": 3, "start_date": "2024-01-02"
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    # Jan 2 still sees Jan 1 inside its window; Jan 4's window (Jan 2-4) no longer does
+    assert body["keys"] == ["2024-01-02", "2024-01-04"]
+    assert body["series"][0]["values"] == [pytest.approx(14 / 5), pytest.approx(10 / 3)]
+
+    response = client.post("/api/compare", json={"task_ids": [task_id], "metric": "win_rate", "window": 2})
+    assert response.json()["series"][0]["values"] == [1.0, 0.5, 0.5]
+
+    response = client.post("/api/compare", json={
+        "task_ids": [task_id], "metric": "kills", "window": 7, "group_by": "game"
+    })
+    assert response.status_code == 422
+
+def test_create_tasks_batch_reports_item_errors_and_creates_valid_tasks(monkeypatch):
+    submitted = []
+    monkeypatch.setattr("backend.main.scheduler.submit_many", lambda jobs: submitted.extend(jobs))
+
+    valid = dict(API_BASE_TASK_PAYLOAD, game_type="valorant", characters=["Jett"])
+    payloads = [
+        valid,
+        dict(API_BASE_TASK_PAYLOAD, game_type="overwatch"),  # missing characters
+        dict(API_BASE_TASK_PAYLOAD, game_type="custom", gameSources=["valorant"], name="Custom"),
+        {"name": "Broken"},
+        "notadict",
+    ]
+
+    response = client.post("/api/tasks/batch", json=payloads)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 3)
+    assert [item["index"] for item in body["results"]] == [0, 1, 2, 3, 4]
+    assert body["results"][0]["task"]["characters"] == ["Jett"]
+    assert body["results"][0]["task"]["status"] == "pending"
+    assert body["results"][2]["task"]["gameSources"] == ["valorant"]
+    assert "task" not in body["results"][1]
+    assert any("Characters must be provided" in error["msg"] for error in body["results"][1]["errors"])
+    assert {error["loc"][0] for error in body["results"][3]["errors"]} >= {"game_type", "start_date"}
+    assert [error["type"] for error in body["results"][4]["errors"]] == ["model_type"]
+    assert "errors" not in body["results"][0]
+
+    created_ids = [body["results"][0]["task"]["id"], body["results"][2]["task"]["id"]]
+    assert [args[0] for _, _, args in submitted] == created_ids
+    db = TestingSessionLocal()
+    assert db.query(Task).filter(Task.id.in_(created_ids)).count() == 2
+    db.close()
+
+    # Batch-created tasks have the same JSON shape as POST /api/tasks responses
+    single = client.post("/api/tasks", json=valid).json()
+    batch_task = dict(body["results"][0]["task"], id=single["id"])
+    assert batch_task == single
+
+def test_create_tasks_batch_inserts_tasks_in_one_statement(monkeypatch):
+    monkeypatch.setattr("backend.main.scheduler.submit_many", lambda jobs: None)
+    payloads = [dict(API_BASE_TASK_PAYLOAD, game_type="fortnite", name=f"Batch {n}") for n in range(5)]
+
+    task_inserts = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO tasks"):
+            task_inserts.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/api/tasks/batch", json=payloads)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert len(task_inserts) == 1
+    # Rows come back in payload order
+    assert [item["task"]["name"] for item in response.json()["results"]] == [f"Batch {n}" for n in range(5)]
+
+def test_create_tasks_batch_rejects_oversized_batch():
+    response = client.post("/api/tasks/batch", json=[API_BASE_TASK_PAYLOAD] * 501)
+    assert response.status_code == 400
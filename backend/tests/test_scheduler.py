@@ -0,0 +1,98 @@
+import threading
+import time
+from datetime import date
+from types import SimpleNamespace
+
+from backend.scheduler import TaskScheduler, estimate_task_cost
+
+
+def make_task(**overrides):
+    fields = {
+        "game_type": "valorant",
+        "start_date": date(2024, 1, 1),
+        "end_date": date(2024, 1, 10),
+        "characters": ["Jett", "Sage"],
+        "gameSources": [],
+        "gameCharacters": {},
+    }
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def test_estimate_task_cost_single_game():
+    # 10 days x 1 game x 2 characters
+    assert estimate_task_cost(make_task()) == 20
+
+
+def test_estimate_task_cost_custom_sources():
+    task = make_task(
+        game_type="custom",
+        gameSources=["valorant", "overwatch"],
+        gameCharacters={"valorant": ["Jett", "Sage", "Omen"]},
+    )
+    # 10 days x (3 valorant characters + 2 default for overwatch)
+    assert estimate_task_cost(task) == 50
+
+
+def test_estimate_task_cost_all_games_is_heavier():
+    long_all = make_task(game_type="all", start_date=date(2020, 1, 1), end_date=date(2024, 12, 31))
+    assert estimate_task_cost(long_all) > 100 * estimate_task_cost(make_task())
+
+
+def test_scheduler_runs_cheapest_job_first():
+    sched = TaskScheduler(workers=1, max_heavy=1, heavy_cost=1000)
+    gate = threading.Event()
+    order = []
+    done = threading.Event()
+
+    # Block the single worker so the remaining jobs queue up
+    sched.submit(1, gate.wait)
+    sched.submit(500, order.append, "large")
+    sched.submit(5, order.append, "small")
+    sched.submit(50, order.append, "medium")
+    sched.submit(600, done.set)
+    gate.set()
+
+    assert done.wait(2)
+    assert order == ["small", "medium", "large"]
+
+
+def test_scheduler_caps_heavy_jobs():
+    sched = TaskScheduler(workers=3, max_heavy=1, heavy_cost=100)
+    release = threading.Event()
+    light_done = threading.Event()
+
+    sched.submit(1000, release.wait)
+    sched.submit(2000, release.wait)
+    time.sleep(0.1)
+
+    # Second heavy job stays queued while a light job still gets a worker
+    assert sched.pending() == 1
+    sched.submit(1, light_done.set)
+    assert light_done.wait(2)
+
+    release.set()
+
+
+def test_scheduler_runs_heavy_job_despite_steady_light_jobs():
+    sched = TaskScheduler(workers=1, max_heavy=1, heavy_cost=100, bypass_limit=3)
+    gate = threading.Event()
+    blocked = threading.Event()
+    order = []
+    heavy_done = threading.Event()
+
+    sched.submit(1, lambda: (blocked.set(), gate.wait()))
+    assert blocked.wait(2)
+    sched.submit(1000, lambda: (order.append("heavy"), heavy_done.set()))
+
+    # Every light job queues another one, so the light queue never drains
+    def light(n):
+        order.append(n)
+        if n < 20:
+            sched.submit(1, light, n + 1)
+
+    sched.submit(1, light, 0)
+    gate.set()
+
+    assert heavy_done.wait(2)
+    assert order.index("heavy") == 3
@@ -0,0 +1,172 @@
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from backend.database import Base
+from backend.models import Task, ResultCacheEntry
+from backend import shared_state
+from backend.scheduler import estimate_task_cost
+from backend.shared_state import (
+    DatabaseTaskScheduler,
+    cache_get,
+    cache_invalidate,
+    cache_set,
+    events_after,
+    next_pending_task,
+    publish_status,
+    requeue_stale_claims,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'shared.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def add_task(db, status="pending", start_date=date(2024, 1, 1), end_date=date(2024, 1, 10), **fields):
+    task = Task(
+        name="Shared Task",
+        game_type=fields.pop("game_type", "apex_legends"),
+        start_date=start_date,
+        end_date=end_date,
+        metrics=["kills"],
+        status=status,
+        **fields
+    )
+    task.cost = estimate_task_cost(task)
+    db.add(task)
+    db.commit()
+    return task.id
+
+
+def test_events_are_returned_in_order_after_cursor(engine):
+    with Session(bind=engine) as db:
+        publish_status(db, 1, "pending")
+        publish_status(db, 1, "in_progress")
+        publish_status(db, 2, "pending")
+        db.commit()
+
+        events = events_after(db, 0)
+        assert [(e.task_id, e.status) for e in events] == [(1, "pending"), (1, "in_progress"), (2, "pending")]
+        assert [e.status for e in events_after(db, events[1].id)] == ["pending"]
+
+
+def test_result_cache_round_trip_and_invalidation(engine):
+    with Session(bind=engine) as db:
+        cache_set(db, "1", 1, b'{"task_id":1}')
+        cache_set(db, "1", 1, b'{"task_id":1}')
+        cache_set(db, "2", 2, b'{"task_id":2}')
+        assert cache_get(db, "1") == b'{"task_id":1}'
+
+        cache_invalidate(db, 1)
+        db.commit()
+        assert cache_get(db, "1") is None
+        assert cache_get(db, "2") == b'{"task_id":2}'
+
+
+def test_result_cache_evicts_oldest_beyond_byte_limit(engine, monkeypatch):
+    monkeypatch.setattr(shared_state, "RESULT_CACHE_MAX_BYTES", 6)
+    with Session(bind=engine) as db:
+        for task_id in range(5):
+            cache_set(db, str(task_id), task_id, b"{}")
+        assert sorted(key for key, in db.query(ResultCacheEntry.key)) == ["2", "3", "4"]
+
+        # A payload larger than the whole cache is not stored at all
+        cache_set(db, "5", 5, b"[" + b"0" * 10 + b"]")
+        assert cache_get(db, "5") is None
+        assert db.query(ResultCacheEntry).count() == 3
+
+
+def test_next_pending_task_prefers_cheapest_and_caps_heavy(engine):
+    with Session(bind=engine) as db:
+        heavy = add_task(db, game_type="all", start_date=date(2020, 1, 1), end_date=date(2024, 12, 31))
+        light = add_task(db)
+        assert next_pending_task(db, heavy_cost=1000, max_heavy=1) == light
+
+        db.query(Task).filter(Task.id == light).update({"status": "complete"})
+        add_task(db, status="in_progress", game_type="all", start_date=date(2021, 1, 1), end_date=date(2024, 12, 31))
+        db.commit()
+        # One heavy task is already running elsewhere, so the queued one must wait
+        assert next_pending_task(db, heavy_cost=1000, max_heavy=1) is None
+        assert next_pending_task(db, heavy_cost=1000, max_heavy=2) == heavy
+
+
+def test_database_scheduler_runs_pending_tasks(engine):
+    with Session(bind=engine) as db:
+        task_ids = {add_task(db) for _ in range(3)}
+
+    ran = []
+    all_ran = threading.Event()
+
+    def runner(task_id, bind):
+        with Session(bind=bind) as db:
+            claimed = db.query(Task).filter(Task.id == task_id, Task.status == "pending").update({"status": "complete"})
+            db.commit()
+        if claimed:
+            ran.append(task_id)
+        if len(ran) == len(task_ids):
+            all_ran.set()
+
+    database_scheduler = DatabaseTaskScheduler(runner, engine, workers=2, poll_interval=0.05)
+    database_scheduler.wake()
+
+    assert all_ran.wait(5)
+    database_scheduler.stop()
+    assert sorted(ran) == sorted(task_ids)
+
+
+def test_next_pending_task_runs_heavy_once_bypassed_enough(engine):
+    with Session(bind=engine) as db:
+        heavy = add_task(db, game_type="all", start_date=date(2020, 1, 1), end_date=date(2024, 12, 31))
+        for _ in range(2):
+            add_task(db, status="complete")
+        light = add_task(db)
+        assert next_pending_task(db, heavy_cost=1000, max_heavy=1, bypass_limit=3) == light
+
+        add_task(db, status="in_progress")
+        # Three later tasks have now started ahead of it
+        assert next_pending_task(db, heavy_cost=1000, max_heavy=1, bypass_limit=3) == heavy
+
+
+def test_stale_heavy_claim_is_requeued_instead_of_blocking_the_cap(engine):
+    with Session(bind=engine) as db:
+        heavy = dict(game_type="all", start_date=date(2020, 1, 1), end_date=date(2024, 12, 31))
+        queued = add_task(db, **heavy)
+        # Left in progress by a worker that died two hours ago
+        orphan = add_task(db, status="in_progress", claimed_at=datetime.now() - timedelta(hours=2), **heavy)
+        running = add_task(db, status="in_progress", claimed_at=datetime.now(), game_type="all")
+        assert next_pending_task(db, heavy_cost=1000, max_heavy=1) is None
+
+        assert requeue_stale_claims(db, lease_seconds=3600) == [orphan]
+        assert db.get(Task, orphan).status == "pending"
+        assert db.get(Task, orphan).claimed_at is None
+        assert [e.status for e in events_after(db, 0)] == ["pending"]
+        assert next_pending_task(db, heavy_cost=1000, max_heavy=1) == queued
+
+        # At startup no worker is running, so every claim is requeued
+        assert requeue_stale_claims(db, lease_seconds=0) == [running]
+        assert requeue_stale_claims(db, lease_seconds=0) == []
+
+
+def test_next_pending_task_is_chosen_in_sql_without_scanning_the_queue(engine):
+    with Session(bind=engine) as db:
+        db.add_all(
+            Task(name=f"Queued {n}", game_type="fortnite", start_date=date(2024, 1, 1), end_date=date(2024, 1, 1),
+                 metrics=["kills"], status="pending", cost=100 + n)
+            for n in range(200)
+        )
+        db.commit()
+        cheapest = add_task(db, start_date=date(2024, 1, 1), end_date=date(2024, 1, 1))
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        assert next_pending_task(db, heavy_cost=1000, max_heavy=1) == cheapest
+        # Heavy count, oldest heavy and the cheapest pending task; no rows are loaded per task
+        assert len(statements) == 3
+        assert all("LIMIT" in sql or "count" in sql or "min" in sql for sql in statements)
@@ -100,6 +100,43 @@ export const fetchTaskResults = async (taskId, startDate = null, endDate = null,
   return handleResponse(response);
 };
 
+export const compareTasks = async (taskIds, metric, { groupBy = 'date', window = null, startDate = null, endDate = null, game = null, character = null } = {}) => {
+  const url = `${API_BASE_URL}/compare`;
+  logRequest(url, 'POST');
+
+  const requestBody = {
+    task_ids: taskIds,
+    metric,
+    group_by: groupBy,
+  };
+
+  if (window) {
+    requestBody.window = window;
+  }
+  if (startDate) {
+    requestBody.start_date = startDate;
+  }
+  if (endDate) {
+    requestBody.end_date = endDate;
+  }
+  if (game && game !== 'all') {
+    requestBody.game = game;
+  }
+  if (character && character !== 'all') {
+    requestBody.character = character;
+  }
+
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Accept': 'application/json'
+    },
+    body: JSON.stringify(requestBody),
+  });
+  return handleResponse(response);
+};
+
 export const cancelTask = async (taskId) => {
   const url = `${API_BASE_URL}/tasks/${taskId}/cancel`;
   logRequest(url, 'POST');
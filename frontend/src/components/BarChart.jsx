@@ -1,5 +1,6 @@
 import React, { useEffect, useRef } from 'react';
 import * as d3 from 'd3';
+import { aggregateMetric } from '../utils/metrics';
 
 function BarChart({ data, metric, gameFilter }) {
   const svgRef = useRef();
@@ -35,13 +36,13 @@ function BarChart({ data, metric, gameFilter }) {
     if (gameFilter === 'all') {
       processedData = d3.rollups(
         data,
-        v => d3.mean(v, d => d[metric] || 0),
+        v => aggregateMetric(v, metric),
         d => d.game
       ).map(([game, value]) => ({ category: game, value }));
     } else {
       processedData = d3.rollups(
         data,
-        v => d3.mean(v, d => d[metric] || 0),
+        v => aggregateMetric(v, metric),
         d => d.character || 'Unknown'
       ).map(([character, value]) => ({ category: character, value }));
     }
@@ -0,0 +1,127 @@
+import React, { useEffect, useRef } from 'react';
+import * as d3 from 'd3';
+
+const metricLabel = (metric) =>
+  metric === 'kd_ratio' ? 'K/D Ratio' :
+  metric === 'win_rate' ? 'Win Rate' :
+  metric.charAt(0).toUpperCase() + metric.slice(1);
+
+// One line per task from a POST /api/compare response grouped by date
+function CompareChart({ comparison, taskNames, rollingWindow }) {
+  const svgRef = useRef();
+
+  const hasData = comparison && comparison.keys.length > 0;
+
+  useEffect(() => {
+    if (!hasData) return;
+
+    d3.select(svgRef.current).selectAll("*").remove();
+
+    const margin = { top: 30, right: 30, bottom: 90, left: 60 };
+    const width = svgRef.current.clientWidth - margin.left - margin.right;
+    const height = 400 - margin.top - margin.bottom;
+
+    const svg = d3.select(svgRef.current)
+      .attr("width", width + margin.left + margin.right)
+      .attr("height", height + margin.top + margin.bottom)
+      .append("g")
+      .attr("transform", `translate(${margin.left},${margin.top})`);
+
+    const dates = comparison.keys.map(key => new Date(key));
+    const series = comparison.series.map(s => ({
+      taskId: s.task_id,
+      points: s.values
+        .map((value, i) => ({ date: dates[i], value }))
+        .filter(d => d.value !== null)
+    }));
+
+    const x = d3.scaleTime()
+      .domain(d3.extent(dates))
+      .range([0, width]);
+
+    const y = d3.scaleLinear()
+      .domain([0, (d3.max(series, s => d3.max(s.points, d => d.value)) || 0) * 1.1])
+      .range([height, 0]);
+
+    const color = d3.scaleOrdinal(d3.schemeTableau10)
+      .domain(series.map(s => s.taskId));
+
+    const line = d3.line()
+      .x(d => x(d.date))
+      .y(d => y(d.value))
+      .curve(d3.curveMonotoneX);
+
+    svg.append("g")
+      .attr("transform", `translate(0,${height})`)
+      .call(d3.axisBottom(x).ticks(6))
+      .selectAll("text")
+      .style("text-anchor", "middle")
+      .attr("fill", "#9CA3AF");
+
+    svg.append("g")
+      .call(d3.axisLeft(y))
+      .selectAll("text")
+      .attr("fill", "#9CA3AF");
+
+    svg.selectAll(".compare-line")
+      .data(series)
+      .join("path")
+      .attr("class", "compare-line")
+      .attr("fill", "none")
+      .attr("stroke", s => color(s.taskId))
+      .attr("stroke-width", 2)
+      .attr("d", s => line(s.points));
+
+    const legend = svg.append("g")
+      .attr("transform", `translate(0,${height + 40})`);
+
+    series.forEach((s, i) => {
+      const item = legend.append("g")
+        .attr("transform", `translate(${(i % 3) * (width / 3)},${Math.floor(i / 3) * 18})`);
+      item.append("rect")
+        .attr("width", 12)
+        .attr("height", 12)
+        .attr("fill", color(s.taskId));
+      item.append("text")
+        .attr("x", 18)
+        .attr("y", 10)
+        .style("font-size", "12px")
+        .style("fill", "#D1D5DB")
+        .text(taskNames[s.taskId] || `Task ${s.taskId}`);
+    });
+
+    svg.append("text")
+      .attr("x", width / 2)
+      .attr("y", -10)
+      .attr("text-anchor", "middle")
+      .style("font-size", "16px")
+      .style("fill", "#A78BFA")
+      .text(`${metricLabel(comparison.metric)}${rollingWindow ? ` (${rollingWindow}-day rolling)` : ' by Day'}`);
+
+    svg.selectAll("yGrid")
+      .data(y.ticks())
+      .join("line")
+      .attr("x1", 0)
+      .attr("x2", width)
+      .attr("y1", d => y(d))
+      .attr("y2", d => y(d))
+      .attr("stroke", "#374151")
+      .attr("stroke-width", 0.5);
+  }, [comparison, taskNames, rollingWindow, hasData]);
+
+  if (!hasData) {
+    return (
+      <div className="flex items-center justify-center h-64 bg-gray-800 rounded-lg">
+        <p className="text-gray-400">No data available for the selected tasks and filters</p>
+      </div>
+    );
+  }
+
+  return (
+    <div className="chart-container">
+      <svg ref={svgRef} width="100%" height="400"></svg>
+    </div>
+  );
+}
+
+export default CompareChart;
@@ -1,14 +1,20 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useMemo } from 'react';
 import { useTaskContext } from '../contexts/TaskContext'; // Add this if not already present, or ensure it's used.
 import LineChart from './LineChart';
 import BarChart from './BarChart';
 import GameSelectionFilter from './GameSelectionFilter';
 import CharacterFilter from './CharacterFilter';
+import CompareChart from './CompareChart';
+import { compareTasks } from '../api';
 // import { fetchTaskResults } from '../api'; // Removed as fetch is now via context
 
+// Server-side limit on tasks per POST /api/compare
+const MAX_COMPARE_TASKS = 10;
+
 function Dashboard({ selectedTask }) {
 
   const {
+    tasks,
     selectedTaskResults,
     isResultsLoading,
     resultsError,
@@ -29,10 +35,18 @@ function Dashboard({ selectedTask }) {
   
   const [activeCharacter, setActiveCharacter] = useState('all');
 
+  // Other completed tasks shown alongside the selected one, fetched in one /api/compare call
+  const [compareTaskIds, setCompareTaskIds] = useState([]);
+  const [rollingWindow, setRollingWindow] = useState(null);
+  const [comparison, setComparison] = useState(null);
+  const [comparisonError, setComparisonError] = useState(null);
+  const taskNames = useMemo(() => Object.fromEntries(tasks.map(task => [task.id, task.name])), [tasks]);
+
   useEffect(() => {
     if (selectedTask) {
       setActiveGameFilter('all');
       setActiveCharacter('all');
+      setCompareTaskIds([]);
       
       setDateRange({
         startDate: selectedTask.start_date,
@@ -55,6 +69,35 @@ function Dashboard({ selectedTask }) {
     }
   }, [selectedTask, dateRange.startDate, dateRange.endDate, activeCharacter, fetchAndSetTaskResults]);
 
+  useEffect(() => {
+    if (activeTab !== 'tasks' || !selectedTask || selectedTask.status !== 'complete') {
+      return;
+    }
+
+    let cancelled = false;
+    setComparisonError(null);
+    compareTasks([selectedTask.id, ...compareTaskIds], activeMetric, {
+      window: rollingWindow,
+      startDate: dateRange.startDate,
+      endDate: dateRange.endDate,
+      game: activeGameFilter,
+      character: activeCharacter
+    })
+      .then(result => {
+        if (!cancelled) setComparison(result);
+      })
+      .catch(err => {
+        if (!cancelled) {
+          setComparison(null);
+          setComparisonError(err.message);
+        }
+      });
+
+    return () => {
+      cancelled = true;
+    };
+  }, [activeTab, selectedTask, compareTaskIds, activeMetric, rollingWindow, dateRange.startDate, dateRange.endDate, activeGameFilter, activeCharacter]);
+
   if (!selectedTask) {
     return (
       <div className="bg-gray-700 rounded-lg p-8 text-center">
@@ -169,6 +212,8 @@ function Dashboard({ selectedTask }) {
       return true;
     });
 
+  const otherCompletedTasks = tasks.filter(task => task.status === 'complete' && task.id !== selectedTask.id);
+
   return (
     <div>
       <div className="mb-6">
@@ -249,6 +294,16 @@ function Dashboard({ selectedTask }) {
             >
               Game Comparison
             </button>
+            <button 
+              onClick={() => setActiveTab('tasks')}
+              className={`px-4 py-2 rounded-md text-sm font-medium ${
+                activeTab === 'tasks' 
+                  ? 'bg-purple-600 text-white' 
+                  : 'bg-gray-700 text-gray-300 hover:bg-gray-600'
+              }`}
+            >
+              Task Comparison
+            </button>
           </div>
           
           <div className="flex items-center space-x-3">
@@ -292,7 +347,52 @@ function Dashboard({ selectedTask }) {
             ))}
           </div>
 
-          {activeTab === 'trends' ? (
+          {activeTab === 'tasks' && (
+            <div className="mb-4">
+              <div className="flex flex-wrap gap-2 mb-3">
+                {[null, 7, 30].map((days) => (
+                  <button
+                    key={days || 'daily'}
+                    onClick={() => setRollingWindow(days)}
+                    className={`px-3 py-1 text-xs rounded-full ${
+                      rollingWindow === days
+                        ? 'bg-purple-600 text-white'
+                        : 'bg-gray-600 text-gray-300 hover:bg-gray-500'
+                    }`}
+                  >
+                    {days ? `${days}-Day Rolling` : 'Daily'}
+                  </button>
+                ))}
+              </div>
+              <div className="flex flex-wrap gap-3">
+                {otherCompletedTasks.map((task) => (
+                  <label key={task.id} className="flex items-center text-sm text-gray-300">
+                    <input
+                      type="checkbox"
+                      className="mr-2"
+                      checked={compareTaskIds.includes(task.id)}
+                      disabled={!compareTaskIds.includes(task.id) && compareTaskIds.length >= MAX_COMPARE_TASKS - 1}
+                      onChange={(e) => setCompareTaskIds(prev =>
+                        e.target.checked ? [...prev, task.id] : prev.filter(id => id !== task.id)
+                      )}
+                    />
+                    {task.name}
+                  </label>
+                ))}
+              </div>
+              {comparisonError && (
+                <p className="mt-3 text-sm text-red-400">{comparisonError}</p>
+              )}
+            </div>
+          )}
+
+          {activeTab === 'tasks' ? (
+            <CompareChart
+              comparison={comparison}
+              taskNames={taskNames}
+              rollingWindow={rollingWindow}
+            />
+          ) : activeTab === 'trends' ? (
             <LineChart 
               data={filteredData} 
               metric={activeMetric} 
@@ -1,5 +1,6 @@
 import React, { useEffect, useRef } from 'react';
 import * as d3 from 'd3';
+import { aggregateMetric } from '../utils/metrics';
 
 function LineChart({ data, metric, gameFilter }) {
   const svgRef = useRef();
@@ -30,7 +31,7 @@ function LineChart({ data, metric, gameFilter }) {
       data,
       v => {
         return {
-          average: d3.mean(v, d => d[metric] || 0),
+          average: aggregateMetric(v, metric),
           games: Array.from(new Set(v.map(d => d.game))).join(', ')
         };
       },
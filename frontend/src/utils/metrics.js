@@ -0,0 +1,17 @@
+import * as d3 from 'd3';
+
+// Combine rows for one chart point. Ratios are recomputed from summed counts,
+// since averaging per-day ratios over-weights days with few games.
+export const aggregateMetric = (rows, metric) => {
+  if (metric === 'kd_ratio') {
+    const kills = d3.sum(rows, d => d.kills || 0);
+    const deaths = d3.sum(rows, d => d.deaths || 0);
+    return deaths > 0 ? kills / deaths : kills;
+  }
+  if (metric === 'win_rate') {
+    const wins = d3.sum(rows, d => d.wins || 0);
+    const games = wins + d3.sum(rows, d => d.losses || 0);
+    return games > 0 ? wins / games : 0;
+  }
+  return d3.mean(rows, d => d[metric] || 0);
+};